@@ -1,12 +1,136 @@
+from datetime import datetime, timedelta
+import argparse
 import os
-from datetime import datetime
 
-from todoist_api_python.api import TodoistAPI
+from bible_reading_plan.utils.readings import (
+    READINGS_PER_WEEK,
+    iter_readings_with_dates,
+    weekday_due_date,
+)
+from bible_reading_plan.utils.todoist_sync import (
+    ImportCheckpoint,
+    TodoistSync,
+    command_key,
+    item_add_command,
+    item_key,
+    item_update_due_command,
+)
 
-from bible_reading_plan.utils.readings import readings_with_dates
+
+def task_content(scheduled_reading):
+    return f"Read {scheduled_reading.reading_nice_name()}"
+
+
+def checkpoint_path(project_id, first_monday):
+    return f"build/todoist/import-{project_id}-{first_monday:%Y-%m-%d}.json"
+
+
+def import_readings(sync, project_id, first_monday, checkpoint=None):
+    """
+    Add a task for every reading in the plan that the Todoist project doesn't
+    have yet, sending the `item_add` commands in batches. Returns the number
+    of tasks added.
+
+    The project's tasks are fetched in one sync read and matched by content
+    and due date, so re-running after a failure only adds what is missing.
+    With an ImportCheckpoint, progress is also recorded locally after each
+    batch.
+    """
+    commands = [
+        item_add_command(task_content(scheduled_reading), project_id, scheduled_reading.due_date)
+        for scheduled_reading in iter_readings_with_dates(first_monday)
+    ]
+    if checkpoint:
+        commands = checkpoint.plan(commands)
+
+    existing = {item_key(item["content"], item.get("due")) for item in sync.read_items(project_id)}
+    if checkpoint:
+        existing |= checkpoint.sent_keys()
+    pending = [command for command in commands if command_key(command) not in existing]
+    if len(pending) < len(commands):
+        print(f"{len(commands) - len(pending)} of {len(commands)} readings are already in Todoist")
+
+    added = 0
+
+    def report(batch):
+        nonlocal added
+        added += len(batch)
+        if checkpoint:
+            checkpoint.mark_sent(batch)
+        print(f"Added {added} of {len(pending)} readings")
+
+    sync.send(pending, on_batch=report)
+    return added
+
+
+def reschedule_readings(sync, project_id, from_date):
+    """
+    Move the project's uncompleted readings onto consecutive weekdays
+    starting at `from_date` (or the Monday after, on a weekend), keeping
+    their order in the plan. Due dates follow the same Monday to Friday
+    schedule as the import. Returns the number of tasks moved.
+    """
+    # Position 5 of the week is the following Monday
+    first_monday = from_date - timedelta(days=from_date.weekday())
+    offset = min(from_date.weekday(), READINGS_PER_WEEK)
+
+    plan_positions = {
+        task_content(scheduled_reading): index
+        for index, scheduled_reading in enumerate(iter_readings_with_dates(first_monday))
+    }
+    remaining = sorted(
+        (item for item in sync.read_items(project_id) if item["content"] in plan_positions),
+        key=lambda item: plan_positions[item["content"]],
+    )
+
+    commands = []
+    for position, item in enumerate(remaining):
+        due_date = weekday_due_date(first_monday, offset + position)
+        _, current_due_date = item_key(item["content"], item.get("due"))
+        if current_due_date != f"{due_date:%Y-%m-%d}":
+            commands.append(item_update_due_command(item["id"], due_date))
+
+    moved = 0
+
+    def report(batch):
+        nonlocal moved
+        moved += len(batch)
+        print(f"Rescheduled {moved} of {len(commands)} readings")
+
+    print(f"{len(remaining)} uncompleted readings, {len(commands)} to reschedule")
+    sync.send(commands, on_batch=report)
+    return moved
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="Import the Bible reading plan into a Todoist project."
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser(
+        "import", help="Add the reading plan to the project (the default)."
+    )
+
+    parser_reschedule = subparsers.add_parser(
+        "reschedule",
+        help="Move the uncompleted readings onto consecutive weekdays from a date.",
+    )
+    parser_reschedule.add_argument(
+        "--from",
+        dest="from_date",
+        type=_parse_date,
+        default=datetime.now().replace(hour=0, minute=0, second=0, microsecond=0),
+        metavar="YYYY-MM-DD",
+        help="Date of the first rescheduled reading (default: today)"
+    )
+
+    args = parser.parse_args()
+
     todoist_api_token = os.environ.get("TODOIST_API_TOKEN")
     if not todoist_api_token:
         print("Error: TODOIST_API_TOKEN environment variable not set")
@@ -17,21 +141,20 @@ def main():
         print("Error: TODOIST_PROJECT_ID environment variable not set")
         return
 
-    api = TodoistAPI(todoist_api_token)
+    sync = TodoistSync(todoist_api_token)
+
+    if args.command == "reschedule":
+        reschedule_readings(sync, project_id, args.from_date)
+        print("Done")
+        return
 
     first_monday_string = input(
         "Enter the Monday on which you want the reading plan to start (YYYY-MM-DD): "
     )
     first_monday = datetime.strptime(first_monday_string, "%Y-%m-%d")
-    all_readings_with_dates = readings_with_dates(first_monday)
 
     print("Adding readings to Todoist")
-    for reading_with_date in all_readings_with_dates:
-        reading = reading_with_date.reading
-        due_string = reading_with_date.due_date.strftime("%Y-%m-%d")
-        api.add_task(
-            content=f"Read {reading}", project_id=project_id, due_string=due_string
-        )
-        print(".", end="", flush=True)
-
-    print("\nDone")
+    checkpoint = ImportCheckpoint(checkpoint_path(project_id, first_monday))
+    import_readings(sync, project_id, first_monday, checkpoint)
+
+    print("Done")
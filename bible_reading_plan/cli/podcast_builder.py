@@ -1,3 +1,5 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 import argparse
 import os
@@ -7,24 +9,52 @@ from dotenv import load_dotenv
 from feedgen.feed import FeedGenerator
 import yaml
 
-from bible_reading_plan.utils.podcast_episode import PodcastEpisode
-from bible_reading_plan.utils.readings import readings_with_dates
+from bible_reading_plan.utils.chapter_index import chapter_index
+from bible_reading_plan.utils.episode_server import EpisodeServer, RangeCache
+from bible_reading_plan.utils.esv_downloader import default_downloader
+from bible_reading_plan.utils.loaders import load_cached
+from bible_reading_plan.utils.metadata_store import LEGACY_EPISODE_METADATA_DIR, episode_metadata_store
+from bible_reading_plan.utils.pipeline import Pipeline, Stage
+from bible_reading_plan.utils.podcast_episode import ASSEMBLY_MODES, PodcastEpisode
+from bible_reading_plan.utils.podcast_feed import (
+    FeedItem,
+    FeedItemCache,
+    write_feed,
+    write_feed_incremental,
+)
+from bible_reading_plan.utils.podcast_segments import ESVReadingSegment, GeneratedSpeechSegment
+from bible_reading_plan.utils.readings import (
+    index_of_today,
+    readings,
+    readings_with_dates,
+    scheduled_reading_at,
+)
 
 load_dotenv()
 
+# An episode moving through the build pipeline
+EpisodeJob = namedtuple("EpisodeJob", ["episode", "audio_exists", "skip"])
 
-def load_podcast_config():
-    with open("podcast_config.yaml", "r") as f:
+
+def _parse_yaml(path):
+    with open(path, "r") as f:
         return yaml.safe_load(f)
 
 
-def get_scheduled_readings_for_year(year):
+def load_podcast_config():
+    return load_cached("podcast_config.yaml", _parse_yaml)
+
+
+def get_start_date_for_year(year):
     config = load_podcast_config()
     year_config = config["years"].get(year)
     if not year_config:
         raise ValueError(f"Year {year} not found in podcast_config.yaml")
-    start_date = datetime.strptime(year_config["start_date"], "%Y-%m-%d")
-    return readings_with_dates(start_date)
+    return datetime.strptime(year_config["start_date"], "%Y-%m-%d")
+
+
+def get_scheduled_readings_for_year(year):
+    return readings_with_dates(get_start_date_for_year(year))
 
 
 def get_configured_years():
@@ -32,42 +62,230 @@ def get_configured_years():
     return sorted(config["years"].keys())
 
 
-def build_audio_files(year, count=None, force=False):
+def readings_needing_audio(scheduled_readings, force=False):
+    """
+    Return the readings whose episode audio will be (re)built, so segments
+    of episodes that are already built are not fetched.
+    """
+    return [
+        scheduled_reading
+        for scheduled_reading in scheduled_readings
+        if force or not os.path.exists(PodcastEpisode(scheduled_reading).file_path())
+    ]
+
+
+def download_esv_chapters(scheduled_readings):
+    """
+    Download every missing ESV chapter for the given readings concurrently.
+    """
+    missing = {}
+    for scheduled_reading in scheduled_readings:
+        for chapter in scheduled_reading.scripture_reading.to_chapters():
+            segment = ESVReadingSegment(chapter)
+            if not segment.is_built():
+                missing[chapter] = segment.file_path()
+
+    if missing:
+        print(f"Downloading {len(missing)} ESV chapters")
+        default_downloader().download_many(list(missing.items()))
+
+
+def refresh_esv_chapters(scheduled_readings):
+    """
+    Revalidate the downloaded ESV chapters for the given readings with
+    conditional requests, downloading again only the ones that changed.
+    Returns the set of changed chapters.
+    """
+    downloaded = {}
+    for scheduled_reading in scheduled_readings:
+        for chapter in scheduled_reading.scripture_reading.to_chapters():
+            segment = ESVReadingSegment(chapter)
+            if segment.is_built():
+                downloaded[chapter] = segment.file_path()
+
+    print(f"Revalidating {len(downloaded)} ESV chapters")
+    changed_paths = set(default_downloader().refresh_many(list(downloaded.items())))
+    return {chapter for chapter, path in downloaded.items() if path in changed_paths}
+
+
+def refresh_audio_files(year, jobs=1, assembly="single-pass"):
+    """
+    Re-download ESV chapters that changed upstream and rebuild only the
+    built episodes that read one of them.
+    """
+    scheduled_readings = get_scheduled_readings_for_year(year)
+    changed = refresh_esv_chapters(scheduled_readings)
+    affected = [
+        scheduled_reading
+        for scheduled_reading in scheduled_readings
+        if changed & set(scheduled_reading.scripture_reading.to_chapters())
+        and os.path.exists(PodcastEpisode(scheduled_reading).file_path())
+    ]
+    print(f"{len(changed)} chapters changed; rebuilding {len(affected)} episodes")
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(build_episode, scheduled_reading, True, assembly)
+            for scheduled_reading in affected
+        ]
+        for future in as_completed(futures):
+            future.result()
+            print("*", end="", flush=True)
+
+    print(f"\n\nRefresh complete: {len(affected)} episodes rebuilt")
+    return affected
+
+
+def synthesize_speech(scheduled_readings, max_workers=8):
+    """
+    Synthesize the unique TTS utterances for the given readings concurrently.
+
+    Intros and chapter announcements repeat across episodes, so texts are
+    deduplicated before anything is sent to the TextToSpeech API.
+    """
+    unique_segments = {}
+    for scheduled_reading in scheduled_readings:
+        for segment in PodcastEpisode(scheduled_reading).segments():
+            if isinstance(segment, GeneratedSpeechSegment):
+                unique_segments.setdefault(segment.text, segment)
+
+    pending = [segment for segment in unique_segments.values() if not segment.is_built()]
+    cached_count = len(unique_segments) - len(pending)
+    print(
+        f"Speech: {len(unique_segments)} unique utterances, "
+        f"{cached_count} cached, {len(pending)} to synthesize"
+    )
+    if not pending:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(segment.build) for segment in pending]
+        for future in as_completed(futures):
+            future.result()
+            print("*", end="", flush=True)
+    print()
+
+
+def build_episode(scheduled_reading, force=False, assembly="single-pass"):
+    return PodcastEpisode(scheduled_reading).build(force=force, assembly=assembly)
+
+
+def build_audio_files(year, count=None, force=False, jobs=1, assembly="single-pass", pipeline=False):
+    """
+    Build episode audio, running up to `jobs` episodes at once.
+
+    Episode builds mostly wait on ffmpeg subprocesses and network calls, so a
+    thread pool is enough to overlap them. Progress is reported from this
+    thread as episodes finish. With `pipeline`, episodes stream through
+    build_audio_pipeline() instead of downloading everything up front.
+    """
     generated_count = 0
     cached_count = 0
 
     scheduled_readings = get_scheduled_readings_for_year(year)
     readings_to_build = scheduled_readings[:count] if count else scheduled_readings
 
-    for scheduled_reading in readings_to_build:
-        podcast_episode = PodcastEpisode(scheduled_reading)
-        was_generated = podcast_episode.build(force=force)
+    if pipeline:
+        generated_count, cached_count = build_audio_pipeline(
+            readings_to_build, force=force, assembly=assembly, jobs=jobs
+        )
+    else:
+        readings_to_fetch = readings_needing_audio(readings_to_build, force)
+        download_esv_chapters(readings_to_fetch)
+        synthesize_speech(readings_to_fetch)
 
-        if was_generated:
-            print("*", end="", flush=True)
-            generated_count += 1
-        else:
-            print(".", end="", flush=True)
-            cached_count += 1
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(build_episode, scheduled_reading, force, assembly)
+                for scheduled_reading in readings_to_build
+            ]
+            for future in as_completed(futures):
+                if future.result():
+                    print("*", end="", flush=True)
+                    generated_count += 1
+                else:
+                    print(".", end="", flush=True)
+                    cached_count += 1
 
     total = len(readings_to_build)
     print(f"\n\nBuild complete: {generated_count} generated, {cached_count} cached (total: {total})")
 
 
-def build_podcast_feed(year):
-    gcs_bucket = os.environ.get("GCS_BUCKET")
-    if not gcs_bucket:
-        print("Error: GCS_BUCKET environment variable not set")
-        return
+def build_audio_pipeline(scheduled_readings, force=False, assembly="single-pass", jobs=1,
+                         fetch_workers=4, queue_size=2, report_interval=5.0):
+    """
+    Build episodes through a pipeline of stages joined by bounded queues:
+    plan segments, fetch ESV/TTS audio, normalize for assembly, assemble.
 
-    if not os.path.exists("build"):
-        os.makedirs("build", exist_ok=True)
+    Each stage runs on its own threads, so episode N+1's downloads overlap
+    with episode N's encoding. `jobs` threads normalize and assemble;
+    `fetch_workers` threads fetch. Queue depths and per-stage throughput
+    are printed every `report_interval` seconds.
 
-    shutil.copy("static/podcast-logo.png", "build/logo.png")
+    Returns (generated, cached) counts.
+    """
+    if assembly not in ASSEMBLY_MODES:
+        raise ValueError(f"Unknown assembly mode: {assembly}")
 
-    scheduled_readings = get_scheduled_readings_for_year(year)
+    def plan(scheduled_reading):
+        episode = PodcastEpisode(scheduled_reading)
+        audio_exists = os.path.exists(episode.file_path())
+        if not force and episode.is_built():
+            return EpisodeJob(episode, audio_exists, skip=True)
+        if force:
+            episode.invalidate()
+        episode.segments()
+        return EpisodeJob(episode, audio_exists, skip=False)
+
+    def needs_audio(job):
+        return not job.skip and (force or not job.audio_exists)
+
+    def fetch(job):
+        if needs_audio(job):
+            job.episode.build_segments()
+        return job
+
+    def normalize(job):
+        if needs_audio(job):
+            job.episode.prepare_segments(assembly)
+        return job
+
+    def assemble(job):
+        if needs_audio(job):
+            output_file = job.episode.file_path()
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            job.episode.assemble(job.episode.segments(), output_file, assembly)
+        if not job.skip:
+            job.episode.save_metadata()
+        return not job.skip and not job.audio_exists
 
-    print(f"Generating podcast feed for {year}")
+    pipeline = Pipeline(
+        [
+            Stage("plan", plan),
+            Stage("fetch", fetch, workers=fetch_workers),
+            Stage("normalize", normalize, workers=jobs),
+            Stage("assemble", assemble, workers=jobs),
+        ],
+        queue_size=queue_size,
+    )
+
+    def show_progress(generated):
+        print("*" if generated else ".", end="", flush=True)
+
+    def show_status(status):
+        print(f"\n{status}", flush=True)
+
+    results = pipeline.run(
+        scheduled_readings, on_result=show_progress, report=show_status,
+        report_interval=report_interval,
+    )
+    print(f"\n{pipeline.status()}")
+    generated = sum(results)
+    return generated, len(results) - generated
+
+
+def new_feed_generator(year, gcs_bucket, last_build_date):
+    """Return a FeedGenerator for `year` with the channel set up and no entries."""
     fg = FeedGenerator()
     fg.load_extension("podcast")
     fg.title(f"Five Day Bible Reading Plan ({year})")
@@ -75,28 +293,144 @@ def build_podcast_feed(year):
     fg.description(f"A weekday Bible reading plan podcast for {year}.")
     fg.id(f"https://storage.googleapis.com/{gcs_bucket}/podcast-{year}")
     fg.logo(f"https://storage.googleapis.com/{gcs_bucket}/logo.png")
-    for scheduled_reading in scheduled_readings:
-        if scheduled_reading.due_date > datetime.now():
-            break
+    fg.lastBuildDate(last_build_date)
+    return fg
 
-        episode = PodcastEpisode(scheduled_reading)
 
-        due_date = scheduled_reading.due_date
-        fe = fg.add_entry()
-        fe.title(episode.title())
-        reading_local_path = episode.file_path()
-        reading_filename = reading_local_path.split("/")[-1]
+def episode_feed_entries(scheduled_readings, gcs_bucket):
+    """
+    Return (title, url, description) for the episodes of `scheduled_readings`.
+
+    Episodes are shared by all years (only their publication dates differ),
+    so this is computed once and reused for each year's feed.
+    """
+    entries = []
+    for scheduled_reading in scheduled_readings:
+        episode = PodcastEpisode(scheduled_reading)
+        reading_filename = episode.file_path().split("/")[-1]
         url = f"https://storage.googleapis.com/{gcs_bucket}/readings/{reading_filename}"
-        fe.enclosure(url, 0, "audio/mpeg")
-        fe.description(episode.get_description())
-        due_date = due_date.replace(tzinfo=timezone.utc)
-        fe.pubDate(due_date)
-        fe.id(url)
-        print(".", end="", flush=True)
+        entries.append((episode.title(), url, episode.get_description()))
+    return entries
+
+
+def feed_items_for_year(year, entries, now=None):
+    """Return the FeedItems published in `year`'s feed as of `now`."""
+    start_date = get_start_date_for_year(year)
+    last_index = index_of_today(start_date, now or datetime.now())
+    all_readings = readings()
+    items = []
+    for index, (title, url, description) in enumerate(entries[:last_index + 1]):
+        scheduled_reading = scheduled_reading_at(start_date, index, all_readings)
+        due_date = scheduled_reading.due_date.replace(tzinfo=timezone.utc)
+        items.append(FeedItem(title, url, description, due_date))
+    return items
+
+
+def _prepare_feed_build():
+    gcs_bucket = os.environ.get("GCS_BUCKET")
+    if not gcs_bucket:
+        print("Error: GCS_BUCKET environment variable not set")
+        return None
+
+    os.makedirs("build", exist_ok=True)
+    shutil.copy("static/podcast-logo.png", "build/logo.png")
+    return gcs_bucket
+
+
+def _write_podcast_feed(year, gcs_bucket, entries, incremental=False, now=None):
+    items = feed_items_for_year(year, entries, now)
+
+    # The feed changes only when an episode is published, so it is stamped
+    # with the latest publication date rather than the time of the build
+    if items:
+        last_build_date = items[-1].pub_date
+    else:
+        last_build_date = get_start_date_for_year(year).replace(tzinfo=timezone.utc)
+
+    def make_feed():
+        return new_feed_generator(year, gcs_bucket, last_build_date)
 
     feed_filename = f"build/podcast-{year}.xml"
-    fg.rss_file(feed_filename)
-    print(f"\nPodcast feed saved to {feed_filename}")
+    if incremental:
+        cache = FeedItemCache(f"build/feed_cache/podcast-{year}.json")
+        rendered = write_feed_incremental(make_feed, items, feed_filename, cache)
+        print(f"{year}: rendered {rendered} new or changed entries of {len(items)}")
+    else:
+        write_feed(make_feed, items, feed_filename)
+    print(f"{year}: podcast feed saved to {feed_filename}")
+
+
+def build_podcast_feed(year, incremental=False):
+    build_podcast_feeds([year], incremental=incremental)
+
+
+def build_podcast_feeds(years, incremental=False, jobs=None):
+    """
+    Build the feeds for `years`, rendering up to `jobs` of them at once.
+
+    The episode titles, URLs and descriptions are loaded once and shared by
+    every year's feed, up to the latest episode any of the feeds publishes.
+    """
+    gcs_bucket = _prepare_feed_build()
+    if not gcs_bucket:
+        return
+
+    print(f"Generating podcast feeds for {', '.join(str(year) for year in years)}")
+    now = datetime.now()
+    published_count = max(index_of_today(get_start_date_for_year(year), now) for year in years) + 1
+    scheduled_readings = get_scheduled_readings_for_year(years[0])[:published_count]
+    entries = episode_feed_entries(scheduled_readings, gcs_bucket)
+
+    with ThreadPoolExecutor(max_workers=jobs or len(years)) as executor:
+        futures = [
+            executor.submit(_write_podcast_feed, year, gcs_bucket, entries, incremental, now)
+            for year in years
+        ]
+        for future in futures:
+            future.result()
+
+
+def lookup_reading(query, years):
+    """Print when `query` (a book or chapters) is read in each of `years`."""
+    index = chapter_index()
+    for year in years:
+        scheduled_readings = index.lookup(query, get_start_date_for_year(year))
+        print(f"{year}:")
+        if not scheduled_readings:
+            print("  not in the reading plan")
+        for scheduled_reading in scheduled_readings:
+            due_date = scheduled_reading.due_date.strftime("%a %Y-%m-%d")
+            print(
+                f"  Week {scheduled_reading.week}, Day {scheduled_reading.day} "
+                f"({due_date}): {scheduled_reading.reading_nice_name()}"
+            )
+
+
+def migrate_metadata(directory):
+    count = episode_metadata_store.migrate_from(directory)
+    print(f"Imported {count} episodes into {episode_metadata_store.path}")
+    print(f"The files in {directory}/ can now be deleted")
+
+
+def serve_episodes(host, port, cache_mb):
+    server = EpisodeServer((host, port), range_cache=RangeCache(max_bytes=cache_mb * 1024 * 1024))
+    print(f"Serving episodes at http://{host}:{server.server_address[1]}/readings/WXX_DYY.mp3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a whole number, not {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return number
 
 
 def main():
@@ -126,6 +460,53 @@ def main():
         action="store_true",
         help="Force regeneration of episodes even if they already exist"
     )
+    parser_audio.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Number of episodes to build in parallel (default: 1)"
+    )
+    parser_audio.add_argument(
+        "--assembly",
+        choices=ASSEMBLY_MODES,
+        default="single-pass",
+        help="How to assemble episode audio: one ffmpeg pass, the older "
+        "cached-WAV path, or MP3 frame stitching of segments encoded once "
+        "(default: single-pass)"
+    )
+
+    parser_audio.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Stream episodes through overlapping plan/fetch/normalize/assemble "
+        "stages, reporting queue depths and throughput"
+    )
+
+    # Subcommand for re-downloading ESV audio that changed upstream
+    parser_refresh = subparsers.add_parser(
+        "refresh",
+        help="Re-download ESV chapters that changed upstream and rebuild the episodes that use them."
+    )
+    parser_refresh.add_argument(
+        "-y", "--year",
+        type=int,
+        required=True,
+        help="Year whose episodes to refresh (must be configured in podcast_config.yaml)"
+    )
+    parser_refresh.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        default=1,
+        metavar="N",
+        help="Number of episodes to rebuild in parallel (default: 1)"
+    )
+    parser_refresh.add_argument(
+        "--assembly",
+        choices=ASSEMBLY_MODES,
+        default="single-pass",
+        help="How to assemble rebuilt episodes (default: single-pass)"
+    )
 
     # Subcommand for building the podcast feed
     parser_feed = subparsers.add_parser(
@@ -142,14 +523,92 @@ def main():
         action="store_true",
         help="Build feeds for all configured years"
     )
+    parser_feed.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only render entries that are new or changed since the last build "
+        "(cached in build/feed_cache/)"
+    )
+    parser_feed.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        metavar="N",
+        help="Number of feeds to render in parallel (default: one per year)"
+    )
+
+    # Subcommand for finding when a chapter or book is read
+    parser_lookup = subparsers.add_parser(
+        "lookup", help="Show when a chapter or book is read, e.g. \"Psalm 23\"."
+    )
+    parser_lookup.add_argument(
+        "query",
+        help="Book, chapter or chapters to look up (e.g. \"Ps 23\", \"Genesis 1-3\", \"Jude\")"
+    )
+    parser_lookup.add_argument(
+        "-y", "--year",
+        type=int,
+        help="Year to look up (default: all configured years)"
+    )
+
+    # Subcommand for importing per-episode metadata files into the store
+    parser_migrate = subparsers.add_parser(
+        "migrate-metadata",
+        help="Import per-episode metadata JSON files into the consolidated store."
+    )
+    parser_migrate.add_argument(
+        "--from",
+        dest="directory",
+        default=LEGACY_EPISODE_METADATA_DIR,
+        help=f"Directory of WXX_DYY.json files (default: {LEGACY_EPISODE_METADATA_DIR})"
+    )
+
+    # Subcommand for streaming episodes without building them
+    parser_serve = subparsers.add_parser(
+        "serve",
+        help="Stream episodes over HTTP straight from segment audio, without building them."
+    )
+    parser_serve.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to listen on (default: 127.0.0.1)"
+    )
+    parser_serve.add_argument(
+        "-p", "--port",
+        type=int,
+        default=8000,
+        help="Port to listen on (default: 8000)"
+    )
+    parser_serve.add_argument(
+        "--cache-mb",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="Memory for caching frequently requested byte ranges (default: 64)"
+    )
 
     args = parser.parse_args()
 
     if args.command == "build-audio":
-        build_audio_files(year=args.year, count=args.count, force=args.force)
+        build_audio_files(
+            year=args.year,
+            count=args.count,
+            force=args.force,
+            jobs=args.jobs,
+            assembly=args.assembly,
+            pipeline=args.pipeline,
+        )
+    elif args.command == "refresh":
+        refresh_audio_files(year=args.year, jobs=args.jobs, assembly=args.assembly)
+    elif args.command == "serve":
+        serve_episodes(args.host, args.port, args.cache_mb)
+    elif args.command == "migrate-metadata":
+        migrate_metadata(args.directory)
+    elif args.command == "lookup":
+        years = [args.year] if args.year else get_configured_years()
+        try:
+            lookup_reading(args.query, years)
+        except ValueError as e:
+            print(f"Error: {e}")
     elif args.command == "build-feed":
-        if args.all_years:
-            for year in get_configured_years():
-                build_podcast_feed(year)
-        else:
-            build_podcast_feed(args.year)
+        years = get_configured_years() if args.all_years else [args.year]
+        build_podcast_feeds(years, incremental=args.incremental, jobs=args.jobs)
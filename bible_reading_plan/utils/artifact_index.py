@@ -0,0 +1,82 @@
+import atexit
+import json
+import os
+import threading
+
+from .artifacts import atomic_write
+
+
+class ArtifactIndex:
+    """
+    Persistent JSON index of values derived from build artifacts.
+
+    Entries are keyed by artifact path and remember the file's size,
+    modification time and inode. An entry is only returned while the file
+    still has the same identity, so a rewritten artifact is derived again.
+    The index is written back when `save()` is called and at interpreter
+    exit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        atexit.register(self.save)
+
+    @staticmethod
+    def _identity(artifact_path):
+        stat = os.stat(artifact_path)
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        try:
+            with open(self.path, "r") as f:
+                self._entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._entries = {}
+        return self._entries
+
+    def get(self, artifact_path):
+        """Return the values stored for `artifact_path`, or None if stale or missing."""
+        try:
+            identity = self._identity(artifact_path)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            entry = self._load().get(artifact_path)
+        if entry is None or entry["identity"] != identity:
+            return None
+        return entry["values"]
+
+    def put(self, artifact_path, **values):
+        """Store `values` for the current version of `artifact_path`."""
+        identity = self._identity(artifact_path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(artifact_path)
+            if entry is not None and entry["identity"] == identity:
+                values = {**entry["values"], **values}
+            entries[artifact_path] = {"identity": identity, "values": values}
+            self._dirty = True
+
+    def get_or_compute(self, artifact_path, key, compute):
+        """Return the stored `key` for `artifact_path`, computing and storing it if needed."""
+        values = self.get(artifact_path)
+        if values is not None and key in values:
+            return values[key]
+
+        value = compute()
+        self.put(artifact_path, **{key: value})
+        return value
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            with atomic_write(self.path) as f:
+                json.dump(self._entries, f, separators=(",", ":"), sort_keys=True)
+            self._dirty = False
@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def path_lock(path):
+    """
+    Return the lock that serializes creation of the build artifact at `path`.
+
+    Episodes share artifacts (silence files, TTS clips, ESV chapters, cached
+    WAVs), so parallel builds take this lock before checking for and writing
+    an artifact. That way no worker ever reads a half-written file.
+    """
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def atomic_write(path, mode="w", encoding=None):
+    """
+    Open a temporary file next to `path` and move it into place on success.
+
+    Readers see either the old file or the complete new one, never a
+    partially written file. On error the temporary file is removed.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@contextmanager
+def atomic_output(path):
+    """
+    Yield a temporary path next to `path` for an external tool such as
+    ffmpeg to write, and move it into place on success.
+
+    The temporary path keeps the extension of `path`, so tools that infer
+    the output format from it still work.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(path)[1]
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=f".tmp{extension}"
+    )
+    os.close(fd)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
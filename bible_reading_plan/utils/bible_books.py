@@ -1,3 +1,5 @@
+from bisect import bisect_right
+
 BIBLE_BOOKS = [
     "Genesis",
     "Exodus",
@@ -67,14 +69,148 @@ BIBLE_BOOKS = [
     "Revelation",
 ]
 
+# Number of chapters in each book, in BIBLE_BOOKS order
+CHAPTER_COUNTS = [
+    50, 40, 27, 36, 34, 24, 21, 4, 31, 24, 22, 25, 29, 36, 10, 13, 10, 42, 150,
+    31, 12, 8, 66, 52, 5, 48, 12, 14, 3, 9, 1, 4, 7, 3, 3, 3, 2, 14, 4,
+    28, 16, 24, 21, 28, 16, 16, 13, 6, 6, 4, 4, 5, 3, 6, 4, 3, 1, 13, 5, 5, 3,
+    5, 1, 1, 1, 22,
+]
+
+TOTAL_CHAPTERS = sum(CHAPTER_COUNTS)
+
+# Position of each book's first chapter when all chapters are numbered in order
+_CHAPTER_OFFSETS = [sum(CHAPTER_COUNTS[:index]) for index in range(len(BIBLE_BOOKS))]
+
+BOOK_INDEX = {book: index for index, book in enumerate(BIBLE_BOOKS)}
+BOOK_INDEX["Psalms"] = BOOK_INDEX["Psalm"]
+
+
+# Conventional abbreviations that are not prefixes of a book name, or that
+# pick one book for a prefix shared by several
+BOOK_ALIASES = {
+    "Ps": "Psalm",
+    "Pss": "Psalm",
+    "Psalms": "Psalms",
+    "Song": "Song of Solomon",
+    "Song of Songs": "Song of Solomon",
+    "Phil": "Philippians",
+    "Phm": "Philemon",
+    "Phlm": "Philemon",
+    "Judg": "Judges",
+    "Jdg": "Judges",
+    "Mt": "Matthew",
+    "Mk": "Mark",
+    "Lk": "Luke",
+    "Jn": "John",
+    "1 Jn": "1 John",
+    "2 Jn": "2 John",
+    "3 Jn": "3 John",
+    "Jas": "James",
+}
+
+
+class AmbiguousAbbreviationError(ValueError):
+    """
+    Raised when an abbreviation is a prefix of more than one book name.
+    """
+
+
+def _build_abbreviation_index():
+    """
+    Map every prefix of every book name to the book, or to a tuple of the
+    candidate books when the prefix is shared.
+    """
+    candidates = {}
+    for book in BIBLE_BOOKS:
+        for length in range(1, len(book) + 1):
+            candidates.setdefault(book[:length], []).append(book)
+
+    index = {
+        prefix: books[0] if len(books) == 1 else tuple(books)
+        for prefix, books in candidates.items()
+    }
+    index.update({book: book for book in BIBLE_BOOKS})
+    index.update(BOOK_ALIASES)
+    return index
+
+
+_ABBREVIATION_INDEX = _build_abbreviation_index()
+
 
 def full_book_name_from_abbreviation(abbreviation):
     """
     Convert a book abbreviation to its full name.
+
+    Returns None for unknown abbreviations and raises
+    AmbiguousAbbreviationError when several books share the prefix.
     """
-    if abbreviation == "Psalms":
-        return "Psalms"
+    book = _ABBREVIATION_INDEX.get(abbreviation)
+    if isinstance(book, tuple):
+        raise AmbiguousAbbreviationError(
+            f"Ambiguous book abbreviation {abbreviation!r}: could be {', '.join(book)}"
+        )
+    return book
 
-    for book in BIBLE_BOOKS:
-        if book.startswith(abbreviation):
-            return book
+
+def chapter_id(book_index, chapter):
+    """
+    Pack a (book index, chapter) pair into a small int: the book in the high
+    byte and the chapter in the low byte.
+    """
+    if not 0 <= book_index < len(BIBLE_BOOKS):
+        raise ValueError(f"Invalid book index: {book_index}")
+    if not 1 <= chapter <= CHAPTER_COUNTS[book_index]:
+        raise ValueError(
+            f"{BIBLE_BOOKS[book_index]} has {CHAPTER_COUNTS[book_index]} chapters, not {chapter}"
+        )
+    return (book_index << 8) | chapter
+
+
+def unpack_chapter_id(packed):
+    """Return the (book index, chapter) pair for a packed chapter ID."""
+    return packed >> 8, packed & 0xFF
+
+
+def chapter_ordinal(packed):
+    """Return the chapter's position (0 to TOTAL_CHAPTERS - 1) in canonical order."""
+    book_index, chapter = unpack_chapter_id(packed)
+    return _CHAPTER_OFFSETS[book_index] + chapter - 1
+
+
+def chapter_id_from_ordinal(ordinal):
+    """Return the packed chapter ID at position `ordinal` in canonical order."""
+    if not 0 <= ordinal < TOTAL_CHAPTERS:
+        raise ValueError(f"Invalid chapter ordinal: {ordinal}")
+    book_index = bisect_right(_CHAPTER_OFFSETS, ordinal) - 1
+    return chapter_id(book_index, ordinal - _CHAPTER_OFFSETS[book_index] + 1)
+
+
+def chapter_id_from_name(name):
+    """
+    Convert a chapter name such as "Genesis 6" or "Philemon" to its packed ID.
+    Only books with one chapter may be named without a chapter number.
+    """
+    book, _, chapter = name.rpartition(" ")
+    if not chapter.isdigit():
+        book, chapter = name, None
+    if book not in BOOK_INDEX:
+        raise ValueError(f"Invalid chapter name: {name}")
+    book_index = BOOK_INDEX[book]
+    if chapter is None:
+        if CHAPTER_COUNTS[book_index] != 1:
+            raise ValueError(f"Invalid chapter name: {name} (which chapter of {book}?)")
+        chapter = "1"
+    return chapter_id(book_index, int(chapter))
+
+
+def chapter_name(packed):
+    """
+    Convert a packed chapter ID back to its name, e.g. "Genesis 6". Books with
+    one chapter are named without a number, as in ScriptureReading.to_chapters().
+    """
+    book_index, chapter = unpack_chapter_id(packed)
+    book = BIBLE_BOOKS[book_index]
+    if CHAPTER_COUNTS[book_index] == 1:
+        return book
+    return f"{book} {chapter}"
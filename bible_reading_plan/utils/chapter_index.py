@@ -0,0 +1,67 @@
+from .bible_books import unpack_chapter_id
+from .loaders import load_cached
+from .plan_coverage import plan_chapter_ids
+from .readings import READINGS_PATH, ScriptureReading, readings, scheduled_reading_at
+
+
+class ChapterIndex:
+    """
+    Reverse index from chapters and books to the positions (0-based days) of
+    the plan that read them. Positions become dated ScheduledReadings for any
+    start date with the plan's weekday arithmetic.
+    """
+
+    def __init__(self, lines=None):
+        if lines is None:
+            lines = readings()
+        self.lines = list(lines)
+        self._by_chapter = {}
+        self._by_book = {}
+
+        for position, chapter_ids in enumerate(plan_chapter_ids(self.lines)):
+            for packed in chapter_ids:
+                book_index, _ = unpack_chapter_id(packed)
+                self._by_chapter.setdefault(packed, []).append(position)
+                book_positions = self._by_book.setdefault(book_index, [])
+                if not book_positions or book_positions[-1] != position:
+                    book_positions.append(position)
+
+    def positions_for_chapter(self, packed):
+        return list(self._by_chapter.get(packed, []))
+
+    def positions_for_book(self, book_index):
+        return list(self._by_book.get(book_index, []))
+
+    def positions(self, query):
+        """
+        Return the sorted plan positions reading `query`, which may name a
+        book ("Psalms"), a chapter ("Ps 23") or chapters ("Gen 1-3").
+        """
+        positions = set()
+        for part in query.split(";"):
+            _, chapter_part = ScriptureReading(part)._book_and_chapter_parts(part)
+            part_ids = ScriptureReading(part).to_chapter_ids()
+            if chapter_part is None:
+                book_index, _ = unpack_chapter_id(part_ids[0])
+                positions.update(self._by_book.get(book_index, []))
+            else:
+                for packed in part_ids:
+                    positions.update(self._by_chapter.get(packed, []))
+        return sorted(positions)
+
+    def lookup(self, query, first_monday):
+        """Return the ScheduledReadings reading `query` for a plan starting on `first_monday`."""
+        return [
+            scheduled_reading_at(first_monday, position, self.lines)
+            for position in self.positions(query)
+        ]
+
+
+def _build_chapter_index(path):
+    with open(path, "r") as file:
+        return ChapterIndex([line.strip() for line in file])
+
+
+def chapter_index():
+    """Return the ChapterIndex of the packaged plan, built once per process."""
+    return load_cached(READINGS_PATH, _build_chapter_index)
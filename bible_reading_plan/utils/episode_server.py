@@ -0,0 +1,241 @@
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import accumulate
+import re
+import threading
+
+from .esv_downloader import DownloadError
+from .mp3_stitch import part_length, read_part
+from .podcast_episode import PodcastEpisode
+from .readings import READINGS_PER_WEEK, WEEKS_IN_YEAR, scheduled_reading_at
+
+EPISODE_PATH_PATTERN = re.compile(r"^/readings/W(\d\d)_D(\d\d)\.mp3$")
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    """
+    Raised for a Range header that selects no bytes of the file.
+    """
+
+
+def parse_range(header, length):
+    """
+    Return the (start, end) byte range, end exclusive, selected by a Range
+    header for a file of `length` bytes, or None to send the whole file.
+
+    Only single ranges are supported; multiple ranges and malformed headers
+    are ignored, which HTTP allows.
+    """
+    if not header:
+        return None
+    match = _RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        start, end = max(length - int(last), 0), length
+    else:
+        start = int(first)
+        end = length if last == "" else min(int(last) + 1, length)
+        if last != "" and int(last) < start:
+            return None
+
+    if start >= end:
+        raise RangeNotSatisfiable(f"Range {header!r} is outside a file of {length} bytes")
+    return start, end
+
+
+class VirtualFile:
+    """
+    A file made of parts back to back (see mp3_stitch.stitch_plan) that is
+    never written out. Reads are served from the parts by byte offset.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self._ends = list(accumulate(part_length(part) for part in parts))
+        self.length = self._ends[-1] if self._ends else 0
+
+    def iter_bytes(self, start=0, end=None):
+        """Yield the bytes from `start` up to `end` (exclusive) in chunks."""
+        end = self.length if end is None else min(end, self.length)
+        index = bisect_right(self._ends, start)
+        while start < end and index < len(self.parts):
+            part_start = self._ends[index] - part_length(self.parts[index])
+            part_end = min(end, self._ends[index]) - part_start
+            yield from read_part(self.parts[index], start - part_start, part_end)
+            start = self._ends[index]
+            index += 1
+
+
+class RangeCache:
+    """
+    Least recently used cache of response bodies, bounded by total size.
+    Bodies larger than `max_entry_bytes` are not cached.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entry_bytes=1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_entry_bytes or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def episode_parts(week, day):
+    """
+    Return the stitch parts of the episode for `week` and `day`, building
+    and encoding its segments first if needed. Returns None if there is no
+    such episode.
+    """
+    if not (1 <= week <= WEEKS_IN_YEAR and 1 <= day <= READINGS_PER_WEEK):
+        return None
+    # Episodes don't depend on the plan's dates, so any Monday will do
+    index = (week - 1) * READINGS_PER_WEEK + day - 1
+    episode = PodcastEpisode(scheduled_reading_at(datetime(2000, 1, 3), index))
+    for segment in episode.segments():
+        if segment.needs_file:
+            segment.build()
+    return episode.stitch_parts()
+
+
+class EpisodeServer(ThreadingHTTPServer):
+    """
+    HTTP server for episodes at /readings/WXX_DYY.mp3, the same paths as in
+    the feed. Each episode is streamed from its segments' cached audio with
+    Content-Length and Range support; nothing is assembled ahead of time.
+
+    `parts_for` maps (week, day) to an episode's parts, or None.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, parts_for=episode_parts, range_cache=None):
+        super().__init__(address, EpisodeRequestHandler)
+        self.parts_for = parts_for
+        self.range_cache = RangeCache() if range_cache is None else range_cache
+        self._files = {}
+        self._file_locks = defaultdict(threading.Lock)
+        self._files_lock = threading.Lock()
+
+    def episode_file(self, path):
+        """Return the VirtualFile served at `path`, or None."""
+        match = EPISODE_PATH_PATTERN.match(path)
+        if not match:
+            return None
+
+        with self._files_lock:
+            virtual_file = self._files.get(path)
+            file_lock = self._file_locks[path]
+        if virtual_file is not None:
+            return virtual_file
+
+        # Concurrent first requests for an episode wait for one to plan it
+        with file_lock:
+            with self._files_lock:
+                virtual_file = self._files.get(path)
+            if virtual_file is None:
+                parts = self.parts_for(int(match.group(1)), int(match.group(2)))
+                if parts is None:
+                    return None
+                virtual_file = VirtualFile(parts)
+                with self._files_lock:
+                    self._files[path] = virtual_file
+        return virtual_file
+
+
+class EpisodeRequestHandler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        self._response_started = False
+        try:
+            self._serve_episode(send_body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Players routinely drop connections once they have enough audio
+            pass
+        except Exception as e:
+            # Building an episode can fail (a download, ffmpeg, a short
+            # cached file); answer with an error rather than dropping the
+            # connection, unless the response is already under way
+            self.log_error("Failed to serve %s: %r", self.path, e)
+            self.close_connection = True
+            if not self._response_started:
+                self.send_error(503 if isinstance(e, DownloadError) else 500)
+
+    def _serve_episode(self, send_body):
+        path = self.path.split("?", 1)[0]
+        virtual_file = self.server.episode_file(path)
+        if virtual_file is None:
+            self.send_error(404)
+            return
+
+        try:
+            byte_range = parse_range(self.headers.get("Range"), virtual_file.length)
+        except RangeNotSatisfiable:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{virtual_file.length}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, virtual_file.length)
+        self._response_started = True
+        if byte_range:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{virtual_file.length}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        if not send_body:
+            return
+
+        key = (path, start, end)
+        cached = self.server.range_cache.get(key)
+        if cached is not None:
+            self.wfile.write(cached)
+            return
+
+        cache_body = end - start <= self.server.range_cache.max_entry_bytes
+        body = []
+        for chunk in virtual_file.iter_bytes(start, end):
+            self.wfile.write(chunk)
+            if cache_body:
+                body.append(chunk)
+        if cache_body:
+            self.server.range_cache.put(key, b"".join(body))
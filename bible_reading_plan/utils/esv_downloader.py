@@ -0,0 +1,342 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import hashlib
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .artifact_index import ArtifactIndex
+from .http_retry import retry_delay, send_with_retries
+
+ESV_AUDIO_URL = "https://api.esv.org/v3/passage/audio/"
+
+# (requests, seconds) limits of the ESV API for non-commercial keys
+ESV_QUOTAS = [
+    (60, 60),
+    (1000, 60 * 60),
+    (5000, 24 * 60 * 60),
+]
+
+# ETag, Last-Modified, size and fetch time of each downloaded chapter, so
+# refresh() can ask the API whether the audio changed without downloading it
+esv_chapter_index = ArtifactIndex("build/esv_chapters.json")
+
+
+class DownloadError(Exception):
+    """
+    Custom exception for download errors.
+    """
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `capacity` requests per `period` seconds.
+
+    The bucket starts full and refills continuously, so bursts up to the
+    quota are allowed while the long-run rate never exceeds it.
+    """
+
+    def __init__(self, capacity, period, clock=time.monotonic):
+        self.capacity = capacity
+        self.period = period
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        rate = self.capacity / self.period
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Return the seconds until a token is available."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) * self.period / self.capacity
+
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter enforcing several token buckets at once.
+    """
+
+    def __init__(self, quotas=ESV_QUOTAS, max_wait=300, clock=time.monotonic, sleep=time.sleep):
+        self.buckets = [TokenBucket(capacity, period, clock) for capacity, period in quotas]
+        self.max_wait = max_wait
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until every bucket has a token, then take one from each.
+
+        Raises DownloadError rather than sleeping for longer than `max_wait`
+        seconds, which in practice means the daily quota is used up.
+        """
+        with self._lock:
+            while True:
+                wait = max(bucket.wait_time() for bucket in self.buckets)
+                if wait <= 0:
+                    break
+                if wait > self.max_wait:
+                    raise DownloadError(
+                        f"ESV API quota exhausted; next request allowed in {wait:.0f}s"
+                    )
+                self.sleep(wait)
+
+            for bucket in self.buckets:
+                bucket.take()
+
+
+class ESVDownloader:
+    """
+    Downloads ESV chapter audio over one pooled session.
+
+    Requests are rate limited to the API quotas and retried with exponential
+    backoff on 429 and 5xx responses. Downloads stream to disk in
+    `chunk_size` pieces and resume after dropped connections. With a
+    `chapter_index`, the validators of each download are recorded for
+    refresh(). `base_url` can point at a local server for testing.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=ESV_AUDIO_URL,
+        max_workers=4,
+        max_retries=5,
+        backoff=1.0,
+        timeout=60,
+        rate_limiter=None,
+        sleep=time.sleep,
+        chunk_size=64 * 1024,
+        chapter_index=None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.sleep = sleep
+        self.chunk_size = chunk_size
+        self.chapter_index = chapter_index
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, chapter):
+        chapter_encoded = chapter.replace(" ", "+")
+        return f"{self.base_url}?q={chapter_encoded}"
+
+    def _headers(self):
+        api_key = self.api_key or os.getenv("ESV_API_KEY")
+        if not api_key:
+            raise ValueError("ESV_API_KEY environment variable is not set.")
+        return {"Authorization": f"Token {api_key}"}
+
+    def _get(self, chapter, headers, stream=False):
+        """
+        GET the audio for `chapter`, rate limited and retried on 429/5xx
+        responses and connection errors. A 416 response to a Range request
+        is returned for the caller to handle.
+        """
+        url = self.url(chapter)
+
+        def send():
+            self.rate_limiter.acquire()
+            return self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+
+        return send_with_retries(
+            send,
+            lambda message: DownloadError(f"Failed to download audio for {chapter}: {message}"),
+            self.max_retries,
+            self.backoff,
+            self.sleep,
+            accept_statuses={416} if "Range" in headers else (),
+        )
+
+    @staticmethod
+    def _content_range(response):
+        """Return (start, total) from a 206 response; either may be None."""
+        # Content-Range: bytes <start>-<end>/<total>
+        byte_range, _, total = response.headers.get("Content-Range", "").partition("/")
+        start = byte_range.removeprefix("bytes ").partition("-")[0]
+        return (
+            int(start) if start.isdigit() else None,
+            int(total) if total.isdigit() else None,
+        )
+
+    def _save_body(self, response, part_path, append):
+        # A dropped connection loses at most the chunk being read
+        with open(part_path, "ab" if append else "wb") as f:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                f.write(chunk)
+
+    def _record(self, path, etag=None, last_modified=None):
+        if self.chapter_index is None:
+            return
+        values = {"fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        if etag:
+            values["etag"] = etag
+        if last_modified:
+            values["last_modified"] = last_modified
+        self.chapter_index.put(path, size=os.path.getsize(path), **values)
+
+    def download(self, chapter, path):
+        """
+        Download the audio for `chapter` to `path`.
+
+        The audio is streamed to `path` + ".part" in chunks. If the
+        connection drops, the download resumes from where it stopped with a
+        Range request. The file is renamed to `path` only once its size
+        matches the length the server sent, so `path` never holds a
+        truncated download.
+        """
+        self._download(chapter, path)
+
+    def _download(self, chapter, path, conditional_headers=None):
+        """
+        Download `chapter` to `path` as described in download(). A fresh
+        (non-resumed) request also carries `conditional_headers`; returns
+        False if the server answered 304 Not Modified, True otherwise.
+        """
+        # Ask for the raw bytes so sizes match Content-Length
+        headers = dict(self._headers(), **{"Accept-Encoding": "identity"})
+        part_path = path + ".part"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        for attempt in range(self.max_retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset:
+                request_headers = dict(headers, Range=f"bytes={offset}-")
+            else:
+                request_headers = dict(headers, **(conditional_headers or {}))
+
+            try:
+                with self._get(chapter, request_headers, stream=True) as response:
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if response.status_code == 304:
+                        self._record(path, etag, last_modified)
+                        return False
+
+                    resumed = response.status_code == 206
+                    if resumed:
+                        start, expected = self._content_range(response)
+                    else:
+                        length = response.headers.get("Content-Length", "")
+                        expected = int(length) if length.isdigit() else None
+
+                    if response.status_code == 416 or (resumed and start != offset):
+                        # The partial file can't be resumed; start over
+                        os.remove(part_path)
+                        continue
+                    self._save_body(response, part_path, append=resumed)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if attempt == self.max_retries:
+                    raise DownloadError(f"Failed to download audio for {chapter}: {e}")
+                self.sleep(retry_delay(attempt, self.backoff))
+                continue
+
+            size = os.path.getsize(part_path)
+            if expected is None or size == expected:
+                os.replace(part_path, path)
+                self._record(path, etag, last_modified)
+                return True
+            if size > expected:
+                os.remove(part_path)
+            if attempt < self.max_retries:
+                self.sleep(retry_delay(attempt, self.backoff))
+
+        raise DownloadError(f"Failed to download audio for {chapter}: incomplete download")
+
+    def refresh(self, chapter, path):
+        """
+        Check whether the audio for `chapter` changed since it was downloaded
+        to `path`, and download it again if so. Returns True if `path` now
+        holds different audio.
+
+        The request carries If-None-Match/If-Modified-Since from the
+        validators recorded at download time, so unchanged audio costs one
+        empty 304 response. Without recorded validators the audio is
+        downloaded and compared with the existing file.
+        """
+        if not os.path.exists(path):
+            self._download(chapter, path)
+            return True
+
+        stored = self.chapter_index.get(path) if self.chapter_index is not None else None
+        conditional_headers = {}
+        if stored and stored.get("etag"):
+            conditional_headers["If-None-Match"] = stored["etag"]
+        if stored and stored.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = stored["last_modified"]
+
+        previous_digest = _file_digest(path)
+        if not self._download(chapter, path, conditional_headers):
+            return False
+        return _file_digest(path) != previous_digest
+
+    def download_many(self, downloads):
+        """
+        Download (chapter, path) pairs concurrently.
+
+        Returns the list of paths written, in the order given.
+        """
+        def download_one(item):
+            chapter, path = item
+            self.download(chapter, path)
+            return path
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(download_one, downloads))
+
+    def refresh_many(self, downloads):
+        """
+        Refresh (chapter, path) pairs concurrently, at most `max_workers` at
+        a time.
+
+        Returns the list of paths whose audio changed, in the order given.
+        """
+        def refresh_one(item):
+            chapter, path = item
+            return self.refresh(chapter, path)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            changed = list(executor.map(refresh_one, downloads))
+        return [path for (_, path), is_changed in zip(downloads, changed) if is_changed]
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+_default_downloader = None
+_default_downloader_lock = threading.Lock()
+
+
+def default_downloader():
+    """Return the process-wide ESVDownloader, creating it on first use."""
+    global _default_downloader
+    with _default_downloader_lock:
+        if _default_downloader is None:
+            _default_downloader = ESVDownloader(chapter_index=esv_chapter_index)
+        return _default_downloader
@@ -0,0 +1,55 @@
+import requests
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Request errors that may succeed on another attempt
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+def retry_delay(attempt, backoff, response=None):
+    """
+    Return the seconds to wait before retrying after `attempt` (counting
+    from 0): the response's Retry-After if it gives one in seconds, and
+    exponential backoff otherwise.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff * 2**attempt
+
+
+def send_with_retries(send, error, max_retries, backoff, sleep, accept_statuses=()):
+    """
+    Return the response of `send()`, retrying connection errors, timeouts
+    and 429/5xx responses up to `max_retries` times with retry_delay()
+    between attempts.
+
+    Other request errors, and error statuses that are neither retried nor
+    in `accept_statuses`, are raised as the exception `error(message)`
+    returns for a description of the failure.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = send()
+        except RETRY_EXCEPTIONS as e:
+            if attempt == max_retries:
+                raise error(str(e))
+            sleep(retry_delay(attempt, backoff))
+            continue
+        except requests.exceptions.RequestException as e:
+            raise error(str(e))
+
+        if response.status_code in RETRY_STATUS_CODES and attempt < max_retries:
+            response.close()
+            sleep(retry_delay(attempt, backoff, response))
+            continue
+
+        if response.status_code in accept_statuses:
+            return response
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            response.close()
+            raise error(str(e))
+        return response
@@ -0,0 +1,31 @@
+import os
+import threading
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_cached(path, parse):
+    """
+    Return `parse(path)`, reusing the previous result for as long as the
+    file's modification time is unchanged.
+
+    Parsed values are shared between callers, so they must not be mutated.
+    """
+    key = (os.path.abspath(path), parse)
+    mtime = os.stat(path).st_mtime_ns
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    value = parse(path)
+    with _cache_lock:
+        _cache[key] = (mtime, value)
+    return value
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
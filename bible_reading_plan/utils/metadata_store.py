@@ -0,0 +1,87 @@
+from importlib import resources
+import json
+import os
+import threading
+
+from .artifacts import atomic_write
+
+EPISODE_METADATA_PATH = str(
+    resources.files("bible_reading_plan").joinpath("metadata", "episodes.json")
+)
+
+# Where episode metadata lived before the consolidated store, one file each
+LEGACY_EPISODE_METADATA_DIR = "bible_reading_plan/metadata/episodes"
+
+
+class EpisodeMetadataStore:
+    """
+    All episodes' metadata (title, description, chapter start times and
+    duration) in one JSON file, keyed like "W01_D03".
+
+    The file is loaded once on first use. `put()` updates one entry and
+    rewrites the file only when that entry actually changed. Entries are
+    written one per line so diffs stay readable.
+    """
+
+    def __init__(self, path=EPISODE_METADATA_PATH):
+        self.path = path
+        self._entries = None
+        self._lock = threading.RLock()
+
+    def _load(self):
+        if self._entries is None:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            else:
+                self._entries = {}
+        return self._entries
+
+    def get(self, key):
+        """Return the metadata for `key`, or None if not found."""
+        with self._lock:
+            return self._load().get(key)
+
+    def keys(self):
+        with self._lock:
+            return sorted(self._load())
+
+    def put(self, key, metadata, save=True):
+        """
+        Store the metadata for `key`. Returns True if the stored data changed.
+        """
+        metadata = json.loads(json.dumps(metadata))  # store tuples as lists, like the file
+        with self._lock:
+            entries = self._load()
+            if entries.get(key) == metadata:
+                return False
+            entries[key] = metadata
+            if save:
+                self.save()
+            return True
+
+    def save(self):
+        with self._lock:
+            entries = self._load()
+            lines = [
+                f"{json.dumps(key)}: {json.dumps(entries[key], ensure_ascii=False, separators=(',', ':'))}"
+                for key in sorted(entries)
+            ]
+            with atomic_write(self.path, encoding="utf-8") as f:
+                f.write("{\n" + ",\n".join(lines) + "\n}\n")
+
+    def migrate_from(self, directory=LEGACY_EPISODE_METADATA_DIR):
+        """
+        Import the per-episode WXX_DYY.json files in `directory`. Returns the
+        number of episodes imported.
+        """
+        filenames = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+        with self._lock:
+            for filename in filenames:
+                with open(os.path.join(directory, filename), "r") as f:
+                    self.put(filename[:-len(".json")], json.load(f), save=False)
+            self.save()
+        return len(filenames)
+
+
+episode_metadata_store = EpisodeMetadataStore()
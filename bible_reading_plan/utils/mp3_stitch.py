@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+from .artifacts import atomic_write
+from .podcast_segments import id3v2_size, parse_frame_header, xing_offset
+
+# Every stitched source is first encoded to this one profile, so its frames
+# can be concatenated with any other source's frames as they are
+STITCH_SAMPLE_RATE = 44100
+STITCH_BITRATE = 128000
+STITCH_SAMPLES_PER_FRAME = 1152
+
+# ffmpeg output options for the profile. Without the bit reservoir each
+# frame holds all of its own audio data, so a file can start or end at any
+# frame boundary; no Xing header or ID3 tags are written.
+STITCH_OUTPUT_OPTIONS = {
+    "acodec": "libmp3lame",
+    "audio_bitrate": "128k",
+    "ar": str(STITCH_SAMPLE_RATE),
+    "ac": 1,
+    "reservoir": 0,
+    "write_xing": 0,
+    "id3v2_version": 0,
+    "map_metadata": -1,
+    "format": "mp3",
+}
+
+# Header of an unpadded 128 kbps, 44.1 kHz, mono MPEG-1 Layer III frame
+_FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC0])
+_FRAME = parse_frame_header(_FRAME_HEADER)
+
+# All-zero side information and no main data: a frame that decodes to
+# silence, so silence needs no encoder at all
+SILENT_FRAME = _FRAME_HEADER + bytes(_FRAME.length - 4)
+
+# A byte range of a file, holding `frames` whole MP3 frames
+FilePart = namedtuple("FilePart", ["path", "offset", "length", "frames"])
+
+# The audio frames of an MP3 file, without tags or a Xing/Info header
+AudioSpan = namedtuple("AudioSpan", ["offset", "length", "frames"])
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _is_stitch_profile(frame):
+    return (
+        frame.mpeg1
+        and frame.layer == 3
+        and frame.bitrate == STITCH_BITRATE
+        and frame.sample_rate == STITCH_SAMPLE_RATE
+        and frame.mono
+    )
+
+
+def audio_span(data, name="MP3 data"):
+    """
+    Return the AudioSpan of the frames in `data`, skipping ID3 and APE tags
+    and any Xing/Info header frame. A truncated final frame is dropped.
+
+    Raises ValueError if the data is not in the stitch profile.
+    """
+    offset = id3v2_size(data)
+    end = len(data)
+    if data[-128:-125] == b"TAG":
+        end -= 128
+
+    first_frame = parse_frame_header(data, offset)
+    if first_frame is None:
+        raise ValueError(f"{name} does not start with an MP3 frame")
+    if data[offset + xing_offset(first_frame):][:4] in (b"Xing", b"Info"):
+        offset += first_frame.length
+
+    start = offset
+    frames = 0
+    while offset + 4 <= end:
+        frame = parse_frame_header(data, offset)
+        if frame is None:
+            if data[offset:offset + 8] == b"APETAGEX" or data[offset:offset + 11] == b"LYRICSBEGIN":
+                break
+            raise ValueError(f"{name} has an invalid MP3 frame at byte {offset}")
+        if not _is_stitch_profile(frame):
+            raise ValueError(f"{name} is not 44.1 kHz mono 128 kbps MPEG-1 Layer III")
+        if offset + frame.length > end:
+            break
+        frames += 1
+        offset += frame.length
+
+    return AudioSpan(start, offset - start, frames)
+
+
+def file_audio_span(path):
+    """Return the AudioSpan of the MP3 file at `path`."""
+    with open(path, "rb") as f:
+        return audio_span(f.read(), path)
+
+
+def silent_frames(duration_ms):
+    """Return silent frames lasting `duration_ms`, to the nearest frame."""
+    count = round(duration_ms * STITCH_SAMPLE_RATE / STITCH_SAMPLES_PER_FRAME / 1000)
+    return SILENT_FRAME * count
+
+
+def info_frame(frame_count, byte_count):
+    """
+    Return an Info (CBR Xing) header frame for a file of `frame_count` audio
+    frames and `byte_count` bytes in total, including this frame.
+    """
+    frame = bytearray(SILENT_FRAME)
+    tag = xing_offset(_FRAME)
+    frame[tag:tag + 4] = b"Info"
+    frame[tag + 4:tag + 8] = (0x1 | 0x2).to_bytes(4, "big")  # frame and byte counts
+    frame[tag + 8:tag + 12] = frame_count.to_bytes(4, "big")
+    frame[tag + 12:tag + 16] = byte_count.to_bytes(4, "big")
+    return bytes(frame)
+
+
+def part_length(part):
+    return len(part) if isinstance(part, bytes) else part.length
+
+
+def _part_frames(part):
+    return audio_span(part).frames if isinstance(part, bytes) else part.frames
+
+
+def stitch_plan(pieces):
+    """
+    Return the parts of an MP3 file made of `pieces` back to back: an Info
+    header frame followed by the pieces.
+
+    Each piece is either bytes or a FilePart, and holds whole frames in the
+    stitch profile. Nothing is read from disk, so the plan can be written
+    out (write_parts) or served directly.
+    """
+    pieces = [piece for piece in pieces if part_length(piece)]
+    frame_count = sum(_part_frames(piece) for piece in pieces)
+    byte_count = len(SILENT_FRAME) + sum(part_length(piece) for piece in pieces)
+    return [info_frame(frame_count, byte_count)] + pieces
+
+
+def read_part(part, start=0, end=None):
+    """
+    Yield the bytes of `part` from `start` up to `end` (exclusive, default
+    the end of the part) in chunks.
+    """
+    end = part_length(part) if end is None else min(end, part_length(part))
+    if isinstance(part, bytes):
+        if start < end:
+            yield part[start:end]
+        return
+
+    with open(part.path, "rb") as f:
+        f.seek(part.offset + start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError(f"{part.path} is shorter than expected")
+            remaining -= len(chunk)
+            yield chunk
+
+
+def write_parts(parts, path):
+    """Write `parts` to `path` atomically."""
+    with atomic_write(path, "wb") as f:
+        for part in parts:
+            for chunk in read_part(part):
+                f.write(chunk)
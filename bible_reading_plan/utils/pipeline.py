@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline: `func` is applied to each item by `workers`
+    threads, and its return value is passed on to the next stage.
+    """
+
+    def __init__(self, name, func, workers=1):
+        if workers < 1:
+            raise ValueError("A stage needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._running = workers
+        self._lock = threading.Lock()
+
+    def _record(self, seconds):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+
+    def _worker_finished(self):
+        """Return True if this was the stage's last running worker."""
+        with self._lock:
+            self._running -= 1
+            return self._running == 0
+
+
+class Pipeline:
+    """
+    Runs items through stages connected by bounded queues.
+
+    Every stage has its own threads, so different items are in different
+    stages at the same time: while one episode is being encoded, the next
+    one's audio is already downloading. A full queue blocks the stage that
+    feeds it, which keeps at most `queue_size` items waiting between any two
+    stages. If any stage raises, the remaining items are drained without
+    being processed and run() re-raises the first error.
+    """
+
+    def __init__(self, stages, queue_size=2):
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.queue_size = queue_size
+        self._results = queue.Queue()
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._started = None
+
+    def queue_depths(self):
+        """Return the number of items waiting for each stage."""
+        return [q.qsize() for q in self.queues]
+
+    def status(self):
+        """Return a one-line summary of queue depths and stage throughput."""
+        elapsed = max(time.perf_counter() - self._started, 1e-9) if self._started else 0
+        parts = []
+        for stage, depth in zip(self.stages, self.queue_depths()):
+            rate = stage.processed / elapsed if elapsed else 0.0
+            parts.append(
+                f"[{depth}/{self.queue_size}] {stage.name} {stage.processed} ({rate:.2f}/s)"
+            )
+        return f"{elapsed:6.1f}s " + " -> ".join(parts)
+
+    def _fail(self, error):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+
+    def _feed(self, items):
+        try:
+            for item in items:
+                if self._error is not None:
+                    break
+                self.queues[0].put(item)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(self.stages[0].workers):
+                self.queues[0].put(_DONE)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        inbox = self.queues[index]
+        is_last = index == len(self.stages) - 1
+        outbox = self._results if is_last else self.queues[index + 1]
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            if self._error is not None:
+                continue
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except BaseException as e:
+                self._fail(e)
+                continue
+            stage._record(time.perf_counter() - start)
+            outbox.put(result)
+
+        if stage._worker_finished():
+            downstream = 1 if is_last else self.stages[index + 1].workers
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    def run(self, items, on_result=None, report=None, report_interval=5.0):
+        """
+        Push `items` through the stages and return the final results in
+        completion order. `on_result(result)` is called for each as it
+        finishes, and `report(status)` every `report_interval` seconds.
+        """
+        self._started = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, args=(items,), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads += [
+                threading.Thread(target=self._work, args=(index,), daemon=True)
+                for _ in range(stage.workers)
+            ]
+        for thread in threads:
+            thread.start()
+
+        results = []
+        next_report = time.perf_counter() + report_interval
+        while True:
+            timeout = max(next_report - time.perf_counter(), 0) if report else None
+            try:
+                result = self._results.get(timeout=timeout)
+            except queue.Empty:
+                result = None
+            else:
+                if result is _DONE:
+                    break
+                results.append(result)
+                if on_result:
+                    on_result(result)
+            if report and time.perf_counter() >= next_report:
+                report(self.status())
+                next_report += report_interval
+
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return results
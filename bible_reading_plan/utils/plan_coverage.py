@@ -0,0 +1,84 @@
+from .bible_books import TOTAL_CHAPTERS, chapter_id_from_ordinal, chapter_name, chapter_ordinal
+from .readings import ScriptureReading, readings
+
+
+class ChapterCoverage:
+    """
+    Bitset with one bit per chapter of the Bible, in canonical order, that
+    also tracks chapters added more than once.
+    """
+
+    def __init__(self):
+        self.read = 0
+        self.overlaps = 0
+
+    def add(self, packed):
+        bit = 1 << chapter_ordinal(packed)
+        if self.read & bit:
+            self.overlaps |= bit
+        self.read |= bit
+
+    def add_all(self, chapter_ids):
+        for packed in chapter_ids:
+            self.add(packed)
+
+    def is_complete(self):
+        """Return True if every chapter was added exactly once."""
+        return self.read == (1 << TOTAL_CHAPTERS) - 1 and not self.overlaps
+
+    @staticmethod
+    def _chapter_ids(bits):
+        chapter_ids = []
+        ordinal = 0
+        while bits:
+            if bits & 1:
+                chapter_ids.append(chapter_id_from_ordinal(ordinal))
+            bits >>= 1
+            ordinal += 1
+        return chapter_ids
+
+    def missing(self):
+        """Return the packed IDs of chapters never added."""
+        return self._chapter_ids(~self.read & ((1 << TOTAL_CHAPTERS) - 1))
+
+    def duplicates(self):
+        """Return the packed IDs of chapters added more than once."""
+        return self._chapter_ids(self.overlaps)
+
+
+def plan_chapter_ids(lines=None):
+    """
+    Return one array of packed chapter IDs per day of the plan. Defaults to
+    the packaged readings.txt.
+    """
+    if lines is None:
+        lines = readings()
+    return [ScriptureReading(line).to_chapter_ids() for line in lines]
+
+
+def plan_coverage(lines=None):
+    """Return the ChapterCoverage of a whole plan."""
+    coverage = ChapterCoverage()
+    for chapter_ids in plan_chapter_ids(lines):
+        coverage.add_all(chapter_ids)
+    return coverage
+
+
+def validate_plan(lines=None):
+    """
+    Check that a plan reads every chapter of the Bible exactly once.
+
+    Raises ValueError naming the missing and repeated chapters.
+    """
+    coverage = plan_coverage(lines)
+    if coverage.is_complete():
+        return
+
+    problems = []
+    missing = coverage.missing()
+    if missing:
+        problems.append(f"{len(missing)} missing: {', '.join(map(chapter_name, missing))}")
+    duplicates = coverage.duplicates()
+    if duplicates:
+        problems.append(f"{len(duplicates)} read more than once: {', '.join(map(chapter_name, duplicates))}")
+    raise ValueError(f"Reading plan does not cover the Bible exactly once ({'; '.join(problems)})")
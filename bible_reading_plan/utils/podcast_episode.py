@@ -1,17 +1,55 @@
+from collections import namedtuple
 from datetime import timedelta
-import json
+import hashlib
 import os
 
 import ffmpeg
 
+from .artifact_index import ArtifactIndex
+from .artifacts import atomic_output, path_lock
+from .metadata_store import episode_metadata_store
+from .mp3_stitch import (
+    STITCH_OUTPUT_OPTIONS,
+    AudioSpan,
+    FilePart,
+    file_audio_span,
+    silent_frames,
+    stitch_plan,
+    write_parts,
+)
 from .podcast_segments import BufferSegment, ESVReadingSegment, GeneratedSpeechSegment
 
+# Ways of turning segment audio into an episode MP3:
+# - "single-pass": one ffmpeg process decodes, concatenates and encodes
+# - "wav": decode each segment to a cached WAV, then concatenate and encode
+# - "stitch": encode each segment once to a cached MP3 in one fixed profile,
+#   then concatenate MP3 frames without decoding anything
+ASSEMBLY_MODES = ("single-pass", "wav", "stitch")
+
+# Content hashes of segment MP3s, which name their cached WAVs. Looked up by
+# file size, mtime and inode so warm rebuilds don't re-read the audio.
+content_hash_index = ArtifactIndex("build/content_hashes.json")
+
+# Where the audio frames of cached stitch-profile MP3s start and end
+audio_span_index = ArtifactIndex("build/audio_spans.json")
+
+# A segment in an episode, with its resolved start time and duration in seconds
+PlannedSegment = namedtuple("PlannedSegment", ["segment", "start", "duration"])
+
 # Book names that need pronunciation clarification
 PRONUNCIATION_MAP = {
     "Job": '<phoneme alphabet="ipa" ph="dʒoʊb">Job</phoneme>',
 }
 
 
+def _file_md5(path):
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
 def _create_chapter_announcement_text(chapter_str):
     """
     Transform chapter string to announcement format with SSML pronunciation.
@@ -39,8 +77,19 @@ def _create_chapter_announcement_text(chapter_str):
 
 
 class PodcastEpisode:
+    WAV_CACHE_DIR = "build/wav_cache"
+    MP3_CACHE_DIR = "build/mp3_cache"
+    metadata_store = episode_metadata_store
+
     def __init__(self, scheduled_reading):
         self.scheduled_reading = scheduled_reading
+        self._segments = None
+        self._segment_plan = None
+
+    def invalidate(self):
+        """Forget the memoized segments and durations so they are recomputed."""
+        self._segments = None
+        self._segment_plan = None
 
     def title(self):
         return f"Week {self.scheduled_reading.week}, Day {self.scheduled_reading.day}: {self.scheduled_reading.reading_nice_name()}"
@@ -53,13 +102,26 @@ class PodcastEpisode:
 
     def chapter_start_times(self):
         """Return list of (start_seconds, title) tuples for titled segments."""
-        chapter_start_times = []
-        total_duration = 0
-        for segment in self.segments():
-            if segment.title():
-                chapter_start_times.append((round(total_duration, 1), segment.title()))
-            total_duration += segment.duration()
-        return chapter_start_times
+        return [
+            (round(planned.start, 1), planned.segment.title())
+            for planned in self.segment_plan()
+            if planned.segment.title()
+        ]
+
+    def segment_plan(self):
+        """
+        Return the episode's segments as PlannedSegments with resolved start
+        times and durations. Computed once per episode and reused.
+        """
+        if self._segment_plan is None:
+            plan = []
+            total_duration = 0
+            for segment in self.segments():
+                duration = segment.duration()
+                plan.append(PlannedSegment(segment, total_duration, duration))
+                total_duration += duration
+            self._segment_plan = plan
+        return self._segment_plan
 
     @staticmethod
     def _seconds_to_timestamp(total_seconds):
@@ -72,6 +134,12 @@ class PodcastEpisode:
         return f"{mins}:{secs:02}"
 
     def segments(self):
+        """Return the episode's segments in playback order (memoized)."""
+        if self._segments is None:
+            self._segments = self._create_segments()
+        return self._segments
+
+    def _create_segments(self):
         reading_ssml = self.scheduled_reading.scripture_reading.nice_name_ssml(wrap_speak=False)
         intro_text = f"<speak>Week {self.scheduled_reading.week}, Day {self.scheduled_reading.day}. Today's reading is {reading_ssml}.</speak>"
         intro_segment = GeneratedSpeechSegment(intro_text)
@@ -93,26 +161,23 @@ class PodcastEpisode:
     def file_path(self):
         return f"build/readings/W{self.scheduled_reading.week:02d}_D{self.scheduled_reading.day:02d}.mp3"
 
-    def metadata_file_path(self):
-        return f"bible_reading_plan/metadata/episodes/W{self.scheduled_reading.week:02d}_D{self.scheduled_reading.day:02d}.json"
+    def metadata_key(self):
+        return f"W{self.scheduled_reading.week:02d}_D{self.scheduled_reading.day:02d}"
 
     def save_metadata(self):
-        """Save episode metadata to JSON file for use without audio files."""
+        """Save episode metadata to the metadata store for use without audio files."""
+        plan = self.segment_plan()
         metadata = {
             "title": self.title(),
             "description": self.description(),
             "chapter_start_times": self.chapter_start_times(),
+            "duration": round(sum(planned.duration for planned in plan), 1),
         }
-        os.makedirs(os.path.dirname(self.metadata_file_path()), exist_ok=True)
-        with open(self.metadata_file_path(), "w") as f:
-            json.dump(metadata, f, indent=2)
+        self.metadata_store.put(self.metadata_key(), metadata)
 
     def load_metadata(self):
-        """Load episode metadata from JSON file. Returns None if not found."""
-        if not os.path.exists(self.metadata_file_path()):
-            return None
-        with open(self.metadata_file_path(), "r") as f:
-            return json.load(f)
+        """Load episode metadata from the metadata store. Returns None if not found."""
+        return self.metadata_store.get(self.metadata_key())
 
     def get_description(self):
         """Get description, preferring cached metadata if available."""
@@ -122,24 +187,33 @@ class PodcastEpisode:
         return self.description()
 
     def _convert_segments_to_wav(self, segments, temp_dir):
-        import hashlib
-
-        wav_cache_dir = "build/wav_cache"
+        wav_cache_dir = self.WAV_CACHE_DIR
         os.makedirs(wav_cache_dir, exist_ok=True)
 
         wav_files = []
         for segment in segments:
+            if not segment.needs_file:
+                cached_wav = os.path.join(wav_cache_dir, f"silence-{segment.duration_ms}.wav")
+                with path_lock(cached_wav):
+                    if not os.path.exists(cached_wav):
+                        segment.write_wav(cached_wav)
+                wav_files.append(cached_wav)
+                continue
+
             mp3_path = segment.file_path()
 
-            with open(mp3_path, "rb") as f:
-                mp3_hash = hashlib.md5(f.read()).hexdigest()
+            mp3_hash = content_hash_index.get_or_compute(
+                mp3_path, "md5", lambda: _file_md5(mp3_path)
+            )
 
             cached_wav = os.path.join(wav_cache_dir, f"{mp3_hash}.wav")
 
-            if not os.path.exists(cached_wav):
-                ffmpeg.input(mp3_path).output(
-                    cached_wav, acodec="pcm_s16le", ar="44100", ac=1
-                ).run(overwrite_output=True, quiet=True)
+            with path_lock(cached_wav):
+                if not os.path.exists(cached_wav):
+                    with atomic_output(cached_wav) as temp_path:
+                        ffmpeg.input(mp3_path).output(
+                            temp_path, acodec="pcm_s16le", ar="44100", ac=1
+                        ).run(overwrite_output=True, quiet=True)
 
             wav_files.append(cached_wav)
 
@@ -151,40 +225,154 @@ class PodcastEpisode:
                 f.write(f"file '{os.path.abspath(wav_file)}'\n")
 
     def _concatenate_wav_to_mp3(self, concat_file, output_file):
-        ffmpeg.input(concat_file, format="concat", safe=0).output(
-            output_file, acodec="libmp3lame", audio_bitrate="128k", ar="44100"
-        ).run(overwrite_output=True, quiet=True)
+        with atomic_output(output_file) as temp_path:
+            ffmpeg.input(concat_file, format="concat", safe=0).output(
+                temp_path, acodec="libmp3lame", audio_bitrate="128k", ar="44100"
+            ).run(overwrite_output=True, quiet=True)
 
     def _cleanup_temp_files(self, wav_files, concat_file):
         if os.path.exists(concat_file):
             os.remove(concat_file)
 
-    def build(self, force=False):
+    def _assemble_wav(self, segments, output_file):
+        temp_dir = os.path.dirname(output_file)
+        concat_file = output_file + ".concat.txt"
+        wav_files = []
+
+        try:
+            wav_files = self._convert_segments_to_wav(segments, temp_dir)
+            self._create_concat_file(wav_files, concat_file)
+            self._concatenate_wav_to_mp3(concat_file, output_file)
+        finally:
+            self._cleanup_temp_files(wav_files, concat_file)
+
+    def _single_pass_stream(self, segments, output_file):
+        """
+        Return an ffmpeg graph that decodes every segment, normalizes it to
+        44.1 kHz mono PCM, concatenates the streams and encodes the MP3.
+
+        Each distinct source is decoded once; repeated segments (such as the
+        silence between chapters) are fanned out with `asplit`. Silence is
+        generated inside the graph, so no silence files are needed.
+        """
+        inputs = {segment.file_path(): segment.ffmpeg_input() for segment in segments}
+        paths = [segment.file_path() for segment in segments]
+
+        outputs = {}
+        for path, source in inputs.items():
+            count = paths.count(path)
+            stream = source.audio.filter(
+                "aformat", sample_fmts="s16", sample_rates=44100, channel_layouts="mono"
+            )
+            if count == 1:
+                outputs[path] = iter([stream])
+            else:
+                split = stream.filter_multi_output("asplit", count)
+                outputs[path] = iter(split.stream(i) for i in range(count))
+
+        streams = [next(outputs[path]) for path in paths]
+        return ffmpeg.concat(*streams, v=0, a=1).output(
+            output_file, acodec="libmp3lame", audio_bitrate="128k", ar="44100"
+        )
+
+    def _assemble_single_pass(self, segments, output_file):
+        with atomic_output(output_file) as temp_path:
+            self._single_pass_stream(segments, temp_path).run(
+                overwrite_output=True, quiet=True
+            )
+
+    def _normalize_segment(self, segment):
+        """
+        Return the path of `segment`'s audio encoded in the stitch profile,
+        encoding it on first use. Cached by content hash like the WAVs.
+        """
+        mp3_path = segment.file_path()
+        mp3_hash = content_hash_index.get_or_compute(
+            mp3_path, "md5", lambda: _file_md5(mp3_path)
+        )
+        cached_mp3 = os.path.join(self.MP3_CACHE_DIR, f"{mp3_hash}.mp3")
+
+        with path_lock(cached_mp3):
+            if not os.path.exists(cached_mp3):
+                with atomic_output(cached_mp3) as temp_path:
+                    ffmpeg.input(mp3_path).output(temp_path, **STITCH_OUTPUT_OPTIONS).run(
+                        overwrite_output=True, quiet=True
+                    )
+
+        return cached_mp3
+
+    def stitch_parts(self, segments=None):
+        """
+        Return the episode as a list of byte-level parts (see
+        mp3_stitch.stitch_plan): an Info header, then each segment's frames
+        as a range of its cached MP3, or silent frames for silence.
+        """
+        pieces = []
+        for segment in self.segments() if segments is None else segments:
+            if not segment.needs_file:
+                pieces.append(silent_frames(segment.duration_ms))
+                continue
+            path = self._normalize_segment(segment)
+            span = AudioSpan(*audio_span_index.get_or_compute(
+                path, "span", lambda: file_audio_span(path)
+            ))
+            pieces.append(FilePart(path, span.offset, span.length, span.frames))
+        return stitch_plan(pieces)
+
+    def _assemble_stitch(self, segments, output_file):
+        write_parts(self.stitch_parts(segments), output_file)
+
+    def build_segments(self):
+        """Make sure every segment's source audio is on disk (network work)."""
+        for segment in self.segments():
+            if segment.needs_file:
+                segment.build()
+
+    def prepare_segments(self, assembly="single-pass"):
+        """
+        Fill the per-segment caches `assembly` reads from: decoded WAVs or
+        stitch-profile MP3s (CPU work). Assembly then only reads the
+        caches. Single-pass assembly has nothing to prepare.
+        """
+        segments = [segment for segment in self.segments() if segment.needs_file]
+        if assembly == "wav":
+            self._convert_segments_to_wav(segments, None)
+        elif assembly == "stitch":
+            for segment in segments:
+                self._normalize_segment(segment)
+
+    def assemble(self, segments, output_file, assembly="single-pass"):
+        """Write the audio of `segments` to `output_file` using `assembly`."""
+        if assembly == "wav":
+            self._assemble_wav(segments, output_file)
+        elif assembly == "stitch":
+            self._assemble_stitch(segments, output_file)
+        else:
+            self._assemble_single_pass(segments, output_file)
+
+    def is_built(self):
+        """Return True if both the audio and the metadata exist."""
+        return os.path.exists(self.file_path()) and self.load_metadata() is not None
+
+    def build(self, force=False, assembly="single-pass"):
+        if assembly not in ASSEMBLY_MODES:
+            raise ValueError(f"Unknown assembly mode: {assembly}")
+
         audio_exists = os.path.exists(self.file_path())
-        metadata_exists = os.path.exists(self.metadata_file_path())
 
         # Skip if both audio and metadata exist (unless forced)
-        if not force and audio_exists and metadata_exists:
+        if not force and self.is_built():
             return False
 
+        if force:
+            self.invalidate()
+
         # Build audio if needed
         if force or not audio_exists:
             os.makedirs(os.path.dirname(self.file_path()), exist_ok=True)
 
-            segments = self.segments()
-            for segment in segments:
-                segment.build()
-
-            temp_dir = os.path.dirname(self.file_path())
-            concat_file = self.file_path() + ".concat.txt"
-            wav_files = []
-
-            try:
-                wav_files = self._convert_segments_to_wav(segments, temp_dir)
-                self._create_concat_file(wav_files, concat_file)
-                self._concatenate_wav_to_mp3(concat_file, self.file_path())
-            finally:
-                self._cleanup_temp_files(wav_files, concat_file)
+            self.build_segments()
+            self.assemble(self.segments(), self.file_path(), assembly)
 
         # Save metadata (always, if we got here)
         self.save_metadata()
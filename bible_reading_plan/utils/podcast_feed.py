@@ -0,0 +1,116 @@
+from collections import namedtuple
+import hashlib
+import json
+
+from .artifacts import atomic_write
+
+# One podcast episode as it appears in a feed
+FeedItem = namedtuple("FeedItem", ["title", "url", "description", "pub_date"])
+
+
+def add_feed_item(fg, item):
+    """Add `item` as an entry of the FeedGenerator `fg`."""
+    fe = fg.add_entry()
+    fe.title(item.title)
+    fe.enclosure(item.url, 0, "audio/mpeg")
+    fe.description(item.description)
+    fe.pubDate(item.pub_date)
+    fe.id(item.url)
+
+
+def write_feed(make_feed, items, path):
+    """
+    Render the whole feed with feedgen and write it to `path`.
+
+    `make_feed` returns a FeedGenerator with the channel set up and no
+    entries; `items` are in publication order.
+    """
+    fg = make_feed()
+    for item in items:
+        add_feed_item(fg, item)
+    with atomic_write(path, "wb") as f:
+        f.write(fg.rss_str())
+
+
+def _item_hash(item):
+    fields = [item.title, item.url, item.description, item.pub_date.isoformat()]
+    return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
+
+def render_feed_item(make_feed, item):
+    """
+    Return the serialized <item> element for `item`, exactly as feedgen
+    writes it inside a full feed with the same channel.
+    """
+    fg = make_feed()
+    add_feed_item(fg, item)
+    xml = fg.rss_str()
+    return xml[xml.index(b"<item>"):xml.rindex(b"</channel>")]
+
+
+class FeedItemCache:
+    """
+    Pre-rendered <item> XML for each entry of one feed, keyed by entry URL
+    and validated against a hash of the entry's fields.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+        self._seen = set()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, item):
+        """Return the cached XML for `item`, or None if missing or stale."""
+        self._seen.add(item.url)
+        entry = self._load().get(item.url)
+        if entry is None or entry["hash"] != _item_hash(item):
+            return None
+        return entry["xml"].encode("utf-8")
+
+    def put(self, item, xml):
+        self._seen.add(item.url)
+        self._load()[item.url] = {"hash": _item_hash(item), "xml": xml.decode("utf-8")}
+
+    def save(self):
+        """Write the cache, dropping entries not used since it was loaded."""
+        entries = {url: entry for url, entry in self._load().items() if url in self._seen}
+        with atomic_write(self.path, encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def write_feed_incremental(make_feed, items, path, cache):
+    """
+    Write the feed to `path`, rendering only entries that are new or changed
+    since they were cached. The output is streamed and is byte-identical to
+    write_feed() with the same arguments.
+
+    Returns the number of entries rendered.
+    """
+    channel = make_feed().rss_str()
+    footer_start = channel.rindex(b"</channel>")
+    header, footer = channel[:footer_start], channel[footer_start:]
+
+    rendered = 0
+    with atomic_write(path, "wb") as f:
+        f.write(header)
+        # feedgen lists the newest entry first
+        for item in reversed(items):
+            xml = cache.get(item)
+            if xml is None:
+                xml = render_feed_item(make_feed, item)
+                cache.put(item, xml)
+                rendered += 1
+            f.write(xml)
+        f.write(footer)
+
+    cache.save()
+    return rendered
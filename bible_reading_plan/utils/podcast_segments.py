@@ -1,19 +1,168 @@
+from collections import namedtuple
 import hashlib
 import os
+import wave
 
-from google.cloud import texttospeech
 import ffmpeg
-import requests
+
+from .artifact_index import ArtifactIndex
+from .artifacts import atomic_output, path_lock
+from .esv_downloader import DownloadError, default_downloader
+from .speech_synthesis import synthesize
+
+
+# Probed durations of segment audio, so ffprobe runs once per file
+duration_index = ArtifactIndex("build/durations.json")
+
+# Bitrates in kbps by (MPEG-1?, layer), indexed by the header's bitrate index
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates in Hz by the header's version bits
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],  # MPEG-2.5
+}
+
+MP3FrameHeader = namedtuple(
+    "MP3FrameHeader", ["mpeg1", "layer", "bitrate", "sample_rate", "mono", "samples", "length"]
+)
+
+
+def parse_frame_header(data, offset=0):
+    """
+    Parse the 4-byte MPEG audio frame header at `offset`.
+
+    Returns an MP3FrameHeader, or None if the bytes are not a valid header.
+    """
+    if len(data) < offset + 4:
+        return None
+    b0, b1, b2, b3 = data[offset:offset + 4]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x3
+    layer = 4 - ((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x1
+    mono = (b3 >> 6) == 3
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return MP3FrameHeader(mpeg1, layer, bitrate, sample_rate, mono, samples, length)
+
+
+def id3v2_size(data):
+    """Return the size of the ID3v2 tag at the start of `data`, or 0 if none."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def xing_offset(frame):
+    """Return the offset of a Xing/Info tag from the start of `frame`'s header."""
+    if frame.mpeg1:
+        return 4 + (17 if frame.mono else 32)
+    return 4 + (9 if frame.mono else 17)
+
+
+def _vbr_header_frames(data, offset, frame):
+    """Return the frame count from a Xing/Info or VBRI header, or None."""
+    xing = offset + xing_offset(frame)
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[xing + 4:xing + 8], "big")
+        if flags & 0x1:
+            return int.from_bytes(data[xing + 8:xing + 12], "big")
+
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b"VBRI":
+        return int.from_bytes(data[vbri + 14:vbri + 18], "big")
+
+    return None
+
+
+def mp3_duration(path):
+    """
+    Read the duration of an MP3 file in seconds without spawning ffprobe.
+
+    Uses the Xing/Info or VBRI header when present, which needs only the
+    first frame, and otherwise walks every frame header with small reads.
+    Returns None if the file cannot be parsed.
+    """
+    with open(path, "rb") as f:
+        offset = id3v2_size(f.read(10))
+        f.seek(offset)
+        header = f.read(4)
+        first_frame = parse_frame_header(header)
+        if first_frame is None or first_frame.length == 0:
+            return None
+
+        # VBRI ends at byte 54 of the frame, past a very short frame's end
+        first_frame_data = header + f.read(max(first_frame.length, 54) - 4)
+        vbr_frames = _vbr_header_frames(first_frame_data, 0, first_frame)
+        if vbr_frames is not None:
+            return vbr_frames * first_frame.samples / first_frame.sample_rate
+
+        end = f.seek(0, os.SEEK_END)
+        if end >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b"TAG":
+                end -= 128
+
+        samples = 0
+        while offset + 4 <= end:
+            f.seek(offset)
+            header = f.read(4)
+            frame = parse_frame_header(header)
+            if frame is None or frame.length == 0 or frame.sample_rate != first_frame.sample_rate:
+                tag = header + f.read(7)
+                trailing_tag = tag[:8] == b"APETAGEX" or tag == b"LYRICSBEGIN"
+                if samples and trailing_tag:
+                    break
+                return None
+            if offset + frame.length > end:
+                break
+            samples += frame.samples
+            offset += frame.length
+
+    return samples / first_frame.sample_rate
 
 
 class PodcastSegment:
+    # Whether the segment's audio must exist on disk before assembly
+    needs_file = True
+
     def build(self, force=False):
-        if not force and self.is_built():
-            return
+        with path_lock(self.file_path()):
+            if not force and self.is_built():
+                return
 
-        os.makedirs(os.path.dirname(self.file_path()), exist_ok=True)
+            os.makedirs(os.path.dirname(self.file_path()), exist_ok=True)
 
-        self._build()
+            self._build()
 
     def is_built(self):
         return os.path.exists(self.file_path())
@@ -31,12 +180,27 @@ class PodcastSegment:
         """Return the title for this segment, or None if untitled."""
         return None
 
+    def ffmpeg_input(self):
+        """Return an ffmpeg input stream for this segment's audio."""
+        return ffmpeg.input(self.file_path())
+
     def _duration_from_file(self):
-        metadata = ffmpeg.probe(self.file_path())
-        return round(float(metadata["format"]["duration"]), 1)
+        return duration_index.get_or_compute(
+            self.file_path(), "duration", self._probe_duration
+        )
+
+    def _probe_duration(self):
+        duration = mp3_duration(self.file_path())
+        if duration is None:
+            metadata = ffmpeg.probe(self.file_path())
+            duration = float(metadata["format"]["duration"])
+        return round(duration, 1)
 
 
 class BufferSegment(PodcastSegment):
+    # Silence is generated by the assembler rather than read from a file
+    needs_file = False
+
     def __init__(self, duration_ms=1000):
         if not isinstance(duration_ms, int):
             raise ValueError("duration_ms must be an integer")
@@ -50,9 +214,20 @@ class BufferSegment(PodcastSegment):
         return f"build/silence-{self.duration_ms}.mp3"
 
     def _build(self):
-        ffmpeg.input("anullsrc=r=44100:cl=mono", f="lavfi", t=self.duration()).output(
-            self.file_path()
-        ).run(overwrite_output=True, quiet=True)
+        with atomic_output(self.file_path()) as temp_path:
+            self.ffmpeg_input().output(temp_path).run(overwrite_output=True, quiet=True)
+
+    def ffmpeg_input(self):
+        return ffmpeg.input("anullsrc=r=44100:cl=mono", f="lavfi", t=self.duration())
+
+    def write_wav(self, path, sample_rate=44100):
+        """Write the silence as 16-bit mono PCM without running ffmpeg."""
+        frames = self.duration_ms * sample_rate // 1000
+        with atomic_output(path) as temp_path, wave.open(temp_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(bytes(frames * 2))
 
 
 class GeneratedSpeechSegment(PodcastSegment):
@@ -72,35 +247,11 @@ class GeneratedSpeechSegment(PodcastSegment):
         return f"build/tts/{text_hash}.mp3"
 
     def _build(self):
-        client = texttospeech.TextToSpeechClient()
-
-        if self.text.strip().startswith('<speak>'):
-            synthesis_input = texttospeech.SynthesisInput(ssml=self.text)
-        else:
-            synthesis_input = texttospeech.SynthesisInput(text=self.text)
-
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="en-US",
-            name="en-US-Chirp3-HD-Charon"
-        )
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
-        )
-
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
-
-        with open(self.file_path(), "wb") as out:
-            out.write(response.audio_content)
+        synthesize(self.text, self.file_path())
 
 
 class ESVReadingSegment(PodcastSegment):
-    class DownloadError(Exception):
-        """
-        Custom exception for download errors.
-        """
+    DownloadError = DownloadError
 
     def __init__(self, chapter, title=None):
         self.chapter = chapter
@@ -118,23 +269,4 @@ class ESVReadingSegment(PodcastSegment):
         return f"build/esv_chapters/{filename}.mp3"
 
     def _build(self):
-        api_key = os.getenv("ESV_API_KEY")
-        if not api_key:
-            raise ValueError("ESV_API_KEY environment variable is not set.")
-
-        chapter_encoded = self.chapter.replace(" ", "+")
-        url = f"https://api.esv.org/v3/passage/audio/?q={chapter_encoded}"
-        headers = {"Authorization": f"Token {api_key}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-
-            # Write the audio data to a file
-            with open(self.file_path(), "wb") as f:
-                f.write(response.content)
-
-        except requests.exceptions.RequestException as e:
-            raise self.DownloadError(
-                f"Failed to download audio for {self.chapter}: {e}"
-            )
+        default_downloader().download(self.chapter, self.file_path())
@@ -1,11 +1,16 @@
-from datetime import timedelta
-from .bible_books import full_book_name_from_abbreviation
+from array import array
+from datetime import datetime, timedelta
+from importlib import resources
+from .bible_books import BOOK_INDEX, CHAPTER_COUNTS, chapter_id, full_book_name_from_abbreviation
+from .loaders import load_cached
 
 import re
 
 WEEKS_IN_YEAR = 52
 READINGS_PER_WEEK = 5
 
+READINGS_PATH = str(resources.files("bible_reading_plan").joinpath("readings.txt"))
+
 
 def apply_psalm_ssml(text):
     """
@@ -45,7 +50,32 @@ class ScriptureReading:
         """
         Converts the raw reading string to a list of chapters.
         """
-        chapters = []
+        return [
+            full_book_name if chapter is None else f"{full_book_name} {chapter}"
+            for full_book_name, chapter in self._chapter_parts()
+        ]
+
+    def to_chapter_ids(self):
+        """
+        Converts the raw reading string to an array of packed chapter IDs
+        (see bible_books.chapter_id). A book named without chapters, such as
+        "Philemon" or "Haggai", covers every chapter of the book.
+        """
+        chapter_ids = array("H")
+        for full_book_name, chapter in self._chapter_parts():
+            book_index = BOOK_INDEX[full_book_name]
+            if chapter is None:
+                chapters = range(1, CHAPTER_COUNTS[book_index] + 1)
+            else:
+                chapters = [int(chapter)]
+            chapter_ids.extend(chapter_id(book_index, number) for number in chapters)
+        return chapter_ids
+
+    def _chapter_parts(self):
+        """
+        Yields (full book name, chapter) pairs for the reading. The chapter is
+        None for a whole single-chapter book.
+        """
         for part in self.raw_reading.split(";"):
             part = part.strip()
 
@@ -55,22 +85,18 @@ class ScriptureReading:
                 raise ValueError(f"Invalid book abbreviation: {book_part}")
 
             if chapter_part is None:
-                chapters.append(full_book_name)
+                yield full_book_name, None
             elif "-" in chapter_part:
                 start, end = chapter_part.split("-")
                 start = int(start.strip())
                 end = int(end.strip())
-                chapters.extend(
-                    [f"{full_book_name} {chapter}" for chapter in range(start, end + 1)]
-                )
+                for chapter in range(start, end + 1):
+                    yield full_book_name, chapter
             elif "," in chapter_part:
                 for chapter in chapter_part.split(","):
-                    chapter = chapter.strip()
-                    chapters.append(f"{full_book_name} {chapter}")
+                    yield full_book_name, chapter.strip()
             else:
-                chapters.append(f"{full_book_name} {chapter_part}")
-
-        return chapters
+                yield full_book_name, chapter_part
 
     def nice_name(self):
         """
@@ -147,12 +173,9 @@ class ScheduledReading:
         return self.scripture_reading.nice_name()
 
 
-def readings():
-    """
-    Reads the readings from the 'readings.txt' file and validates the count.
-    """
-    with open("readings.txt", "r") as file:
-        lines = [line.strip() for line in file]
+def _parse_readings(path):
+    with open(path, "r") as file:
+        lines = tuple(line.strip() for line in file)
 
     expected_readings = WEEKS_IN_YEAR * READINGS_PER_WEEK
     assert (
@@ -161,22 +184,97 @@ def readings():
     return lines
 
 
+def readings():
+    """
+    Reads the readings from the packaged 'readings.txt' file and validates the count.
+    The file is parsed once per process and again only if it changes.
+    """
+    return list(load_cached(READINGS_PATH, _parse_readings))
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def weekday_due_date(first_monday, index):
+    """
+    Returns the due date of the reading at position `index` (0-based) of a
+    plan starting on `first_monday`, with five readings a week, Monday to
+    Friday. `index` may run past the end of the plan.
+    """
+    week, day = divmod(index, READINGS_PER_WEEK)
+    return first_monday + timedelta(weeks=week, days=day)
+
+
+def scheduled_reading_at(first_monday, index, all_readings=None):
+    """
+    Returns the ScheduledReading at position `index` (0-based) of the plan.
+    """
+    if all_readings is None:
+        all_readings = readings()
+    week, day = divmod(index, READINGS_PER_WEEK)
+    date = weekday_due_date(first_monday, index)
+    return ScheduledReading(all_readings[index], date, week + 1, day + 1)
+
+
+def iter_readings_with_dates(first_monday, start_index=0):
+    """
+    Lazily yields ScheduledReading objects with their due dates, starting at
+    plan position `start_index`.
+    """
+    all_readings = readings()
+    for index in range(start_index, len(all_readings)):
+        yield scheduled_reading_at(first_monday, index, all_readings)
+
+
 def readings_with_dates(first_monday):
     """
     Generates a list of ScheduledReading objects with their corresponding due dates.
     """
-    all_readings = readings()
-    readings_with_dates = []
+    return list(iter_readings_with_dates(first_monday))
 
-    for week in range(WEEKS_IN_YEAR):
-        for day in range(READINGS_PER_WEEK):
-            index = week * READINGS_PER_WEEK + day
 
-            scripture_reading = all_readings[index]
-            date = first_monday + timedelta(weeks=week, days=day)
+def _index_on_or_before(first_monday, date):
+    """
+    Returns the position of the last reading due on or before `date`, or -1
+    if the plan has not started. Readings fall Monday to Friday, so the index
+    follows from the number of whole weeks and the weekday.
+    """
+    days = (_as_date(date) - _as_date(first_monday)).days
+    if days < 0:
+        return -1
+    week, weekday = divmod(days, 7)
+    if week >= WEEKS_IN_YEAR:
+        return WEEKS_IN_YEAR * READINGS_PER_WEEK - 1
+    return week * READINGS_PER_WEEK + min(weekday, READINGS_PER_WEEK - 1)
 
-            readings_with_dates.append(
-                ScheduledReading(scripture_reading, date, week + 1, day + 1)
-            )
 
-    return readings_with_dates
+def reading_for_date(first_monday, date):
+    """
+    Returns the ScheduledReading due on `date`, or None for weekends and
+    dates outside the plan.
+    """
+    days = (_as_date(date) - _as_date(first_monday)).days
+    week, weekday = divmod(days, 7)
+    if days < 0 or week >= WEEKS_IN_YEAR or weekday >= READINGS_PER_WEEK:
+        return None
+    return scheduled_reading_at(first_monday, week * READINGS_PER_WEEK + weekday)
+
+
+def readings_between(first_monday, start, end):
+    """
+    Lazily yields the ScheduledReadings due from `start` to `end`, inclusive.
+    """
+    first = _index_on_or_before(first_monday, _as_date(start) - timedelta(days=1)) + 1
+    last = _index_on_or_before(first_monday, end)
+    all_readings = readings()
+    for index in range(first, last + 1):
+        yield scheduled_reading_at(first_monday, index, all_readings)
+
+
+def index_of_today(first_monday, today=None):
+    """
+    Returns the position of the latest reading due on or before today, or -1
+    if the plan has not started yet.
+    """
+    return _index_on_or_before(first_monday, today or datetime.now())
@@ -0,0 +1,51 @@
+import threading
+
+from google.cloud import texttospeech
+
+from .artifacts import atomic_write
+
+VOICE_NAME = "en-US-Chirp3-HD-Charon"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def tts_client():
+    """
+    Return the process-wide TextToSpeech client, creating it on first use.
+
+    The client holds a gRPC channel and credentials, so it is shared by every
+    utterance instead of being set up per request. It is safe to use from
+    multiple threads.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = texttospeech.TextToSpeechClient()
+        return _client
+
+
+def synthesize(text, path, voice_name=VOICE_NAME):
+    """
+    Synthesize `text` (plain text or SSML) to an MP3 at `path`.
+    """
+    if text.strip().startswith('<speak>'):
+        synthesis_input = texttospeech.SynthesisInput(ssml=text)
+    else:
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+
+    voice = texttospeech.VoiceSelectionParams(
+        language_code="en-US",
+        name=voice_name
+    )
+
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3
+    )
+
+    response = tts_client().synthesize_speech(
+        input=synthesis_input, voice=voice, audio_config=audio_config
+    )
+
+    with atomic_write(path, "wb") as out:
+        out.write(response.audio_content)
@@ -0,0 +1,181 @@
+import json
+import os
+import time
+import uuid
+
+import requests
+
+from .artifacts import atomic_write
+from .http_retry import send_with_retries
+
+TODOIST_SYNC_URL = "https://api.todoist.com/api/v1/sync"
+
+# The Sync API accepts at most 100 commands per request
+MAX_COMMANDS_PER_REQUEST = 100
+
+
+class SyncError(Exception):
+    """
+    Raised when the Todoist Sync API rejects a request or a command.
+    """
+
+
+def item_add_command(content, project_id, due_date):
+    """Return an `item_add` command creating a task due on `due_date`."""
+    return {
+        "type": "item_add",
+        "uuid": str(uuid.uuid4()),
+        "temp_id": str(uuid.uuid4()),
+        "args": {
+            "content": content,
+            "project_id": project_id,
+            "due": {"date": due_date.strftime("%Y-%m-%d")},
+        },
+    }
+
+
+def item_update_due_command(item_id, due_date):
+    """Return an `item_update` command moving task `item_id` to `due_date`."""
+    return {
+        "type": "item_update",
+        "uuid": str(uuid.uuid4()),
+        "args": {
+            "id": item_id,
+            "due": {"date": due_date.strftime("%Y-%m-%d")},
+        },
+    }
+
+
+def item_key(content, due):
+    """
+    Return the (content, due date) key identifying a reading's task. `due`
+    is a Todoist due object; any time of day is ignored.
+    """
+    due_date = (due or {}).get("date") or ""
+    return (content, due_date[:10])
+
+
+def command_key(command):
+    return item_key(command["args"]["content"], command["args"].get("due"))
+
+
+class TodoistSync:
+    """
+    Minimal client for the Todoist Sync API.
+
+    Commands are sent in batches of up to `batch_size` per request, and
+    requests are retried with exponential backoff on 429 and 5xx responses.
+    `base_url` can point at a local server for testing.
+    """
+
+    def __init__(
+        self,
+        api_token,
+        base_url=TODOIST_SYNC_URL,
+        batch_size=MAX_COMMANDS_PER_REQUEST,
+        max_retries=5,
+        backoff=1.0,
+        timeout=60,
+        sleep=time.sleep,
+    ):
+        if not 1 <= batch_size <= MAX_COMMANDS_PER_REQUEST:
+            raise ValueError(f"batch_size must be between 1 and {MAX_COMMANDS_PER_REQUEST}")
+        self.api_token = api_token
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sleep = sleep
+        self.session = requests.Session()
+
+    def _post(self, data):
+        headers = {"Authorization": f"Bearer {self.api_token}"}
+        response = send_with_retries(
+            lambda: self.session.post(self.base_url, data=data, headers=headers, timeout=self.timeout),
+            lambda message: SyncError(f"Todoist sync request failed: {message}"),
+            self.max_retries,
+            self.backoff,
+            self.sleep,
+        )
+        return response.json()
+
+    def read_items(self, project_id=None):
+        """
+        Return all active tasks, or those in `project_id`, with one full
+        sync read.
+        """
+        result = self._post({"sync_token": "*", "resource_types": json.dumps(["items"])})
+        return [
+            item for item in result.get("items", [])
+            if not item.get("is_deleted") and (project_id is None or item["project_id"] == project_id)
+        ]
+
+    def send_batch(self, commands):
+        """
+        Send up to `batch_size` commands in one request.
+
+        Returns the response's `temp_id_mapping`. Raises SyncError if any
+        command failed.
+        """
+        result = self._post({"commands": json.dumps(commands)})
+        sync_status = result.get("sync_status", {})
+        errors = [
+            f"{command['type']} {command['args'].get('content', command['args'].get('id'))!r}: "
+            f"{sync_status.get(command['uuid'])}"
+            for command in commands
+            if sync_status.get(command["uuid"]) != "ok"
+        ]
+        if errors:
+            raise SyncError(f"{len(errors)} of {len(commands)} commands failed: " + "; ".join(errors))
+        return result.get("temp_id_mapping", {})
+
+    def send(self, commands, on_batch=None):
+        """
+        Send `commands` in batches, in order. `on_batch(batch)` is called
+        after each batch succeeds.
+        """
+        for start in range(0, len(commands), self.batch_size):
+            batch = commands[start:start + self.batch_size]
+            self.send_batch(batch)
+            if on_batch:
+                on_batch(batch)
+
+
+class ImportCheckpoint:
+    """
+    Local record of an import in progress: the planned commands, with their
+    uuids, and which of them have been sent.
+
+    Reusing the uuids on a retry lets Todoist drop commands it already
+    applied, and the sent keys let later runs skip readings whose tasks have
+    since been completed (completed tasks are not returned by a sync read).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.commands = []
+        self.sent = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.commands = data["commands"]
+            self.sent = set(data["sent"])
+
+    def plan(self, commands):
+        """Use the saved commands if there are any, otherwise `commands`."""
+        if not self.commands:
+            self.commands = commands
+            self.save()
+        return self.commands
+
+    def mark_sent(self, commands):
+        self.sent.update(command["uuid"] for command in commands)
+        self.save()
+
+    def sent_keys(self):
+        return {command_key(command) for command in self.commands if command["uuid"] in self.sent}
+
+    def save(self):
+        with atomic_write(self.path, encoding="utf-8") as f:
+            json.dump({"commands": self.commands, "sent": sorted(self.sent)}, f)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compare episode assembly modes by wall time and disk I/O.
+
+Builds the first few episodes of a year into a temporary directory with each
+mode, twice. The cold pass starts from empty WAV and MP3 caches, so the "wav"
+and "stitch" modes pay their full decoding and encoding cost; the warm pass
+shows the cost of assembling episodes once those caches are filled. Segment
+audio must already be built (podcast-bible-plan build-audio).
+
+    python scripts/benchmark_assembly.py --year 2025 --count 5
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bible_reading_plan.cli.podcast_builder import get_scheduled_readings_for_year
+from bible_reading_plan.utils.podcast_episode import ASSEMBLY_MODES, PodcastEpisode
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def benchmark(mode, episodes, work_dir):
+    cache_dir = os.path.join(work_dir, "cache")
+    output_dir = os.path.join(work_dir, "readings")
+    os.makedirs(output_dir, exist_ok=True)
+
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+    for episode in episodes:
+        episode.WAV_CACHE_DIR = os.path.join(cache_dir, "wav")
+        episode.MP3_CACHE_DIR = os.path.join(cache_dir, "mp3")
+        output_file = os.path.join(output_dir, os.path.basename(episode.file_path()))
+        episode.assemble(episode.segments(), output_file, mode)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return {
+        "wall": elapsed,
+        "cpu": cpu + (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime),
+        "intermediate": directory_size(cache_dir),
+        "output": directory_size(output_dir),
+        "blocks_in": after.ru_inblock - before.ru_inblock,
+        "blocks_out": after.ru_oublock - before.ru_oublock,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-y", "--year", type=int, required=True)
+    parser.add_argument("-n", "--count", type=int, default=5)
+    args = parser.parse_args()
+
+    scheduled_readings = get_scheduled_readings_for_year(args.year)[:args.count]
+    episodes = [PodcastEpisode(scheduled_reading) for scheduled_reading in scheduled_readings]
+    for episode in episodes:
+        for segment in episode.segments():
+            if segment.needs_file:
+                segment.build()
+
+    print(f"Assembling {len(episodes)} episodes")
+    print(
+        f"{'mode':12s} {'pass':5s} {'wall':>9s} {'cpu':>9s} {'temp MB':>9s} {'out MB':>8s} "
+        f"{'blk in':>9s} {'blk out':>9s}"
+    )
+    for mode in ASSEMBLY_MODES:
+        with tempfile.TemporaryDirectory(dir="build") as work_dir:
+            for label in ("cold", "warm"):
+                result = benchmark(mode, episodes, work_dir)
+                print(
+                    f"{mode:12s} {label:5s} {result['wall']:8.2f}s {result['cpu']:8.2f}s "
+                    f"{result['intermediate'] / 1e6:9.1f} {result['output'] / 1e6:8.1f} "
+                    f"{result['blocks_in']:9d} {result['blocks_out']:9d}"
+                )
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare the native MP3 duration reader with ffmpeg.probe on built segments.
+
+Run from the repository root after building some audio, e.g.:
+    python scripts/benchmark_durations.py
+"""
+
+import glob
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ffmpeg
+from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+SEGMENT_TYPES = [
+    ("tts", "build/tts/*.mp3"),
+    ("esv", "build/esv_chapters/*.mp3"),
+    ("stitch", "build/mp3_cache/*.mp3"),
+    ("episode", "build/readings/*.mp3"),
+]
+
+
+def probe_duration(path):
+    return float(ffmpeg.probe(path)["format"]["duration"])
+
+
+def time_reader(reader, paths):
+    durations = {}
+    start = time.perf_counter()
+    for path in paths:
+        durations[path] = reader(path)
+    return time.perf_counter() - start, durations
+
+
+if __name__ == "__main__":
+    print(f"{'type':8s} {'files':>6s} {'native':>10s} {'ffprobe':>10s} {'speedup':>8s} {'fallback':>9s} {'max diff':>9s}")
+
+    for label, pattern in SEGMENT_TYPES:
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            print(f"{label:8s} {0:6d}   (no files)")
+            continue
+
+        native_time, native = time_reader(mp3_duration, paths)
+        probe_time, probed = time_reader(probe_duration, paths)
+
+        fallbacks = [path for path in paths if native[path] is None]
+        diffs = [
+            abs(round(native[path], 1) - round(probed[path], 1))
+            for path in paths if native[path] is not None
+        ]
+        max_diff = max(diffs) if diffs else 0.0
+        speedup = probe_time / native_time if native_time else float("inf")
+
+        print(
+            f"{label:8s} {len(paths):6d} {native_time:9.3f}s {probe_time:9.3f}s "
+            f"{speedup:7.1f}x {len(fallbacks):9d} {max_diff:8.1f}s"
+        )
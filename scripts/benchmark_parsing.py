@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark parsing every line of readings.txt into chapters and names.
+
+Compares the indexed book-abbreviation resolver with the previous linear
+prefix scan of BIBLE_BOOKS.
+"""
+
+import os
+import sys
+import timeit
+import unittest.mock as mock
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bible_reading_plan.utils import readings as readings_module
+from bible_reading_plan.utils.bible_books import BIBLE_BOOKS, full_book_name_from_abbreviation
+from bible_reading_plan.utils.readings import ScriptureReading, readings
+
+REPEAT = 5
+NUMBER = 20
+
+
+def linear_scan(abbreviation):
+    if abbreviation == "Psalms":
+        return "Psalms"
+    for book in BIBLE_BOOKS:
+        if book.startswith(abbreviation):
+            return book
+
+
+def parse_all(lines):
+    for line in lines:
+        reading = ScriptureReading(line)
+        reading.to_chapters()
+        reading.nice_name()
+
+
+def best_time(resolver, lines):
+    with mock.patch.object(readings_module, "full_book_name_from_abbreviation", resolver):
+        times = timeit.repeat(lambda: parse_all(lines), repeat=REPEAT, number=NUMBER)
+    return min(times) / NUMBER
+
+
+if __name__ == "__main__":
+    lines = readings()
+    print(f"Parsing {len(lines)} readings (best of {REPEAT} x {NUMBER} runs)")
+    for label, resolver in [("linear scan", linear_scan), ("prefix index", full_book_name_from_abbreviation)]:
+        elapsed = best_time(resolver, lines)
+        print(f"{label:14s} {elapsed * 1000:8.3f} ms per pass")
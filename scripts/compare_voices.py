@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import ffmpeg
 from bible_reading_plan.utils.podcast_segments import BufferSegment, ESVReadingSegment, GeneratedSpeechSegment
 from bible_reading_plan.utils.podcast_episode import _create_chapter_announcement_text
+from bible_reading_plan.utils.speech_synthesis import synthesize
 
 VOICES_TO_TEST = [
     ("chirp3-charon", "en-US-Chirp3-HD-Charon"),
@@ -42,31 +43,7 @@ def build_sample_with_voice(voice_label, voice_name):
         if isinstance(segment, GeneratedSpeechSegment) and hasattr(segment, 'voice_name'):
             original_build = segment._build
             def custom_build(voice=voice_name):
-                from google.cloud import texttospeech
-                client = texttospeech.TextToSpeechClient()
-
-                if segment.text.strip().startswith('<speak>'):
-                    synthesis_input = texttospeech.SynthesisInput(ssml=segment.text)
-                else:
-                    synthesis_input = texttospeech.SynthesisInput(text=segment.text)
-
-                voice_params = texttospeech.VoiceSelectionParams(
-                    language_code="en-US",
-                    name=voice
-                )
-
-                audio_config = texttospeech.AudioConfig(
-                    audio_encoding=texttospeech.AudioEncoding.MP3
-                )
-
-                response = client.synthesize_speech(
-                    input=synthesis_input,
-                    voice=voice_params,
-                    audio_config=audio_config
-                )
-
-                with open(segment.file_path(), "wb") as out:
-                    out.write(response.audio_content)
+                synthesize(segment.text, segment.file_path(), voice_name=voice)
 
             segment._build = custom_build
             segment.build(force=True)
@@ -0,0 +1,125 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import json
+import threading
+
+import pytest
+
+from bible_reading_plan.utils.todoist_sync import TodoistSync
+
+
+class FakeTodoistServer:
+    """
+    Local HTTP server standing in for the Todoist Sync API.
+
+    Keeps tasks in memory, answers full sync reads of items and applies
+    `item_add` and `item_update` commands, ignoring command uuids it has
+    already seen (as Todoist does). Each request takes the next entry of
+    `failures`: an HTTP status returned before the request is processed, a
+    (status, "after") pair returned after it is processed, or None to
+    succeed.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.requests = []
+        self.failures = []
+        self.processed_uuids = set()
+        self.lock = threading.Lock()
+        self._next_id = 1
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                with fake.lock:
+                    fake.requests.append((form, self.headers.get("Authorization")))
+                    failure = fake.failures.pop(0) if fake.failures else None
+                    if isinstance(failure, int):
+                        self._respond(failure, {}, {"Retry-After": "0"})
+                        return
+                    result = fake.handle(form)
+                if failure:
+                    self._respond(failure[0], {}, {"Retry-After": "0"})
+                else:
+                    self._respond(200, result)
+
+            def _respond(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/sync"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        self.thread.start()
+
+    def sync(self, **kwargs):
+        """Return a TodoistSync client for this server that retries without waiting."""
+        kwargs.setdefault("backoff", 0)
+        return TodoistSync("test-token", base_url=self.url, **kwargs)
+
+    def command_requests(self):
+        return [json.loads(form["commands"][0]) for form, _ in self.requests if "commands" in form]
+
+    def add_item(self, content, project_id, due_date, checked=False):
+        item_id = str(self._next_id)
+        self._next_id += 1
+        self.items[item_id] = {
+            "id": item_id,
+            "content": content,
+            "project_id": project_id,
+            "due": {"date": due_date} if due_date else None,
+            "checked": checked,
+        }
+        return item_id
+
+    def handle(self, form):
+        if "sync_token" in form:
+            return {
+                "sync_token": "token",
+                "full_sync": True,
+                "items": [item for item in self.items.values() if not item["checked"]],
+            }
+
+        sync_status = {}
+        temp_id_mapping = {}
+        for command in json.loads(form.get("commands", ["[]"])[0]):
+            args = command["args"]
+            if command["uuid"] in self.processed_uuids:
+                sync_status[command["uuid"]] = "ok"
+                continue
+            if command["type"] == "item_add":
+                due_date = (args.get("due") or {}).get("date")
+                item_id = self.add_item(args["content"], args["project_id"], due_date)
+                temp_id_mapping[command["temp_id"]] = item_id
+            elif command["type"] == "item_update" and args["id"] in self.items:
+                self.items[args["id"]]["due"] = args["due"]
+            else:
+                sync_status[command["uuid"]] = {"error_code": 22, "error": "Invalid command"}
+                continue
+            sync_status[command["uuid"]] = "ok"
+            self.processed_uuids.add(command["uuid"])
+        return {"sync_status": sync_status, "temp_id_mapping": temp_id_mapping}
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def todoist_server():
+    server = FakeTodoistServer()
+    yield server
+    server.close()
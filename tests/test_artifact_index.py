@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+
+from bible_reading_plan.utils.artifact_index import ArtifactIndex
+from bible_reading_plan.utils.artifacts import atomic_output, atomic_write
+
+
+def write_artifact(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+class TestArtifactIndex:
+    def test_get_returns_none_for_missing_entry(self, tmp_path):
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        index = ArtifactIndex(str(tmp_path / "index.json"))
+        assert index.get(str(artifact)) is None
+
+    def test_get_returns_none_for_missing_file(self, tmp_path):
+        index = ArtifactIndex(str(tmp_path / "index.json"))
+        assert index.get(str(tmp_path / "missing.mp3")) is None
+
+    def test_compute_runs_once_per_file(self, tmp_path):
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        index = ArtifactIndex(str(tmp_path / "index.json"))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return 12.3
+
+        assert index.get_or_compute(str(artifact), "duration", compute) == 12.3
+        assert index.get_or_compute(str(artifact), "duration", compute) == 12.3
+        assert len(calls) == 1
+
+    def test_entry_invalidated_when_file_changes(self, tmp_path):
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        index = ArtifactIndex(str(tmp_path / "index.json"))
+        index.put(str(artifact), duration=1.0)
+
+        write_artifact(artifact, b"longer audio")
+
+        assert index.get(str(artifact)) is None
+        assert index.get_or_compute(str(artifact), "duration", lambda: 2.0) == 2.0
+
+    def test_put_merges_values_for_same_identity(self, tmp_path):
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        index = ArtifactIndex(str(tmp_path / "index.json"))
+        index.put(str(artifact), duration=1.0)
+        index.put(str(artifact), md5="abc")
+        assert index.get(str(artifact)) == {"duration": 1.0, "md5": "abc"}
+
+    def test_save_and_reload(self, tmp_path):
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        index_path = tmp_path / "build" / "index.json"
+
+        index = ArtifactIndex(str(index_path))
+        index.put(str(artifact), duration=4.5)
+        index.save()
+
+        reloaded = ArtifactIndex(str(index_path))
+        assert reloaded.get(str(artifact)) == {"duration": 4.5}
+
+    def test_save_skips_write_when_unchanged(self, tmp_path):
+        index_path = tmp_path / "index.json"
+        ArtifactIndex(str(index_path)).save()
+        assert not index_path.exists()
+
+    def test_corrupt_index_is_ignored(self, tmp_path):
+        index_path = tmp_path / "index.json"
+        index_path.write_text("{not json")
+        artifact = tmp_path / "a.mp3"
+        write_artifact(artifact, b"audio")
+        assert ArtifactIndex(str(index_path)).get(str(artifact)) is None
+
+
+class TestAtomicWrite:
+    def test_replaces_file_on_success(self, tmp_path):
+        path = tmp_path / "out.json"
+        with atomic_write(str(path)) as f:
+            json.dump({"a": 1}, f)
+        assert json.loads(path.read_text()) == {"a": 1}
+        assert os.listdir(tmp_path) == ["out.json"]
+
+    def test_keeps_original_on_error(self, tmp_path):
+        path = tmp_path / "out.txt"
+        path.write_text("original")
+        try:
+            with atomic_write(str(path)) as f:
+                f.write("partial")
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        assert path.read_text() == "original"
+        assert os.listdir(tmp_path) == ["out.txt"]
+
+
+class TestAtomicOutput:
+    def test_moves_output_into_place(self, tmp_path):
+        path = tmp_path / "out" / "episode.mp3"
+        with atomic_output(str(path)) as temp_path:
+            assert temp_path.endswith(".mp3")
+            assert not path.exists()
+            with open(temp_path, "wb") as f:
+                f.write(b"audio")
+
+        assert path.read_bytes() == b"audio"
+        assert os.listdir(path.parent) == ["episode.mp3"]
+
+    def test_failure_leaves_no_file(self, tmp_path):
+        path = tmp_path / "episode.mp3"
+        with pytest.raises(RuntimeError):
+            with atomic_output(str(path)) as temp_path:
+                with open(temp_path, "wb") as f:
+                    f.write(b"half an episode")
+                raise RuntimeError("ffmpeg failed")
+
+        assert os.listdir(tmp_path) == []
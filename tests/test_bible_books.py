@@ -1,4 +1,19 @@
-from bible_reading_plan.utils.bible_books import full_book_name_from_abbreviation
+import pytest
+
+from bible_reading_plan.utils.bible_books import (
+    BIBLE_BOOKS,
+    CHAPTER_COUNTS,
+    TOTAL_CHAPTERS,
+    AmbiguousAbbreviationError,
+    chapter_id,
+    chapter_id_from_name,
+    chapter_id_from_ordinal,
+    chapter_name,
+    chapter_ordinal,
+    full_book_name_from_abbreviation,
+    unpack_chapter_id,
+)
+
 
 
 def test_full_book_name_from_abbreviation():
@@ -10,3 +25,70 @@ def test_full_book_name_from_abbreviation():
 
 def test_full_book_name_psalms():
     assert full_book_name_from_abbreviation("Psalms") == "Psalms"
+
+
+def test_full_book_name_exact_names():
+    assert full_book_name_from_abbreviation("Jude") == "Jude"
+    assert full_book_name_from_abbreviation("John") == "John"
+    assert full_book_name_from_abbreviation("Philemon") == "Philemon"
+
+
+def test_full_book_name_aliases():
+    assert full_book_name_from_abbreviation("Ps") == "Psalm"
+    assert full_book_name_from_abbreviation("Song") == "Song of Solomon"
+    assert full_book_name_from_abbreviation("1 Jn") == "1 John"
+    assert full_book_name_from_abbreviation("Phm") == "Philemon"
+    assert full_book_name_from_abbreviation("Phil") == "Philippians"
+
+
+def test_full_book_name_ambiguous_prefix():
+    with pytest.raises(AmbiguousAbbreviationError, match="Joshua, Judges"):
+        full_book_name_from_abbreviation("J")
+
+    with pytest.raises(AmbiguousAbbreviationError, match="Judges, Jude"):
+        full_book_name_from_abbreviation("Jud")
+
+
+def test_full_book_name_unknown():
+    assert full_book_name_from_abbreviation("Hezekiah") is None
+    assert full_book_name_from_abbreviation("") is None
+
+
+def test_every_reading_resolves_unambiguously():
+    from bible_reading_plan.utils.readings import ScriptureReading, readings
+
+    for line in readings():
+        ScriptureReading(line).to_chapters()
+
+
+def test_chapter_counts():
+    assert len(CHAPTER_COUNTS) == len(BIBLE_BOOKS)
+    assert TOTAL_CHAPTERS == 1189
+    assert CHAPTER_COUNTS[BIBLE_BOOKS.index("Psalm")] == 150
+
+
+def test_chapter_id_round_trip():
+    assert chapter_id_from_name("Genesis 6") == chapter_id(0, 6) == 6
+    assert chapter_id_from_name("Psalms 3") == chapter_id_from_name("Psalm 3")
+    assert chapter_id_from_name("Philemon") == chapter_id(56, 1)
+    assert unpack_chapter_id(chapter_id_from_name("1 Corinthians 13")) == (45, 13)
+
+    for name in ["Genesis 1", "Psalm 150", "Song of Solomon 8", "Philemon", "Revelation 22"]:
+        assert chapter_name(chapter_id_from_name(name)) == name
+
+
+def test_chapter_id_rejects_invalid_chapters():
+    with pytest.raises(ValueError, match="Genesis has 50 chapters"):
+        chapter_id(0, 51)
+    with pytest.raises(ValueError):
+        chapter_id_from_name("Hezekiah 1")
+    with pytest.raises(ValueError, match="which chapter of Haggai"):
+        chapter_id_from_name("Haggai")
+
+
+def test_chapter_ordinals():
+    assert chapter_ordinal(chapter_id_from_name("Genesis 1")) == 0
+    assert chapter_ordinal(chapter_id_from_name("Exodus 1")) == 50
+    assert chapter_ordinal(chapter_id_from_name("Revelation 22")) == TOTAL_CHAPTERS - 1
+    for ordinal in [0, 49, 50, 928, 929, 1188]:
+        assert chapter_ordinal(chapter_id_from_ordinal(ordinal)) == ordinal
@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+
+from bible_reading_plan.utils.bible_books import AmbiguousAbbreviationError, BOOK_INDEX, chapter_id_from_name
+from bible_reading_plan.utils.chapter_index import ChapterIndex, chapter_index
+from bible_reading_plan.utils.readings import readings
+
+FIRST_MONDAY = datetime.datetime(2024, 12, 30)
+
+
+def expected_positions(predicate):
+    from bible_reading_plan.utils.readings import ScriptureReading
+
+    return [
+        position for position, line in enumerate(readings())
+        if predicate(ScriptureReading(line).to_chapters())
+    ]
+
+
+def test_chapter_index_is_cached():
+    assert chapter_index() is chapter_index()
+
+
+def test_lookup_chapter():
+    [reading] = chapter_index().lookup("Psalm 23", FIRST_MONDAY)
+    assert "Psalm 23" in reading.scripture_reading.to_chapters()
+    assert reading.due_date == FIRST_MONDAY + datetime.timedelta(
+        weeks=reading.week - 1, days=reading.day - 1
+    )
+
+
+def test_lookup_matches_linear_scan():
+    index = chapter_index()
+    assert index.positions("Ps 23") == expected_positions(lambda chapters: "Psalm 23" in chapters)
+    assert index.positions("Mark 1") == expected_positions(lambda chapters: "Mark 1" in chapters)
+    assert index.positions("Gen 1-3") == expected_positions(
+        lambda chapters: {"Genesis 1", "Genesis 2", "Genesis 3"} & set(chapters)
+    )
+
+
+def test_lookup_book():
+    index = chapter_index()
+    assert index.positions("Psalms") == expected_positions(
+        lambda chapters: any(c.startswith("Psalm") for c in chapters)
+    )
+    assert index.positions("Philemon") == expected_positions(lambda chapters: "Philemon" in chapters)
+    assert index.positions_for_book(BOOK_INDEX["Haggai"]) == index.positions("Haggai 2")
+
+
+def test_lookup_uses_start_date():
+    later = chapter_index().lookup("Genesis 1", datetime.datetime(2025, 12, 29))
+    assert [r.due_date for r in later] == [datetime.datetime(2025, 12, 29)]
+
+
+def test_lookup_invalid_queries():
+    with pytest.raises(ValueError):
+        chapter_index().positions("Hezekiah 1")
+    with pytest.raises(AmbiguousAbbreviationError):
+        chapter_index().positions("J 1")
+
+
+def test_custom_plan():
+    index = ChapterIndex(["Gen 1; Ps 1"] * 2 + ["Gen 2"] * 258)
+    assert index.positions_for_chapter(chapter_id_from_name("Genesis 1")) == [0, 1]
+    assert index.positions("Gen") == list(range(260))
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+import requests
+
+from bible_reading_plan.utils.episode_server import (
+    EpisodeServer,
+    RangeCache,
+    RangeNotSatisfiable,
+    VirtualFile,
+    parse_range,
+)
+from bible_reading_plan.utils.esv_downloader import DownloadError
+from bible_reading_plan.utils.mp3_stitch import FilePart
+
+
+class TestParseRange:
+    def test_ranges(self):
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=0-9", 100) == (0, 10)
+        assert parse_range("bytes=90-", 100) == (90, 100)
+        assert parse_range("bytes=90-200", 100) == (90, 100)
+        assert parse_range("bytes=-10", 100) == (90, 100)
+        assert parse_range("bytes=-200", 100) == (0, 100)
+
+    def test_ignores_unsupported_ranges(self):
+        assert parse_range("bytes=0-9,20-29", 100) is None
+        assert parse_range("bytes=9-0", 100) is None
+        assert parse_range("items=0-9", 100) is None
+        assert parse_range("bytes=-", 100) is None
+
+    def test_unsatisfiable(self):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=100-", 100)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=-0", 100)
+
+
+@pytest.fixture
+def parts(tmp_path):
+    source = tmp_path / "chapter.mp3"
+    source.write_bytes(b"xxHELLO WORLDxx")
+    return [b"abc", FilePart(str(source), 2, 11, 0), b"", b"xyz"]
+
+
+class TestVirtualFile:
+    def test_reads_across_parts(self, parts):
+        virtual_file = VirtualFile(parts)
+        assert virtual_file.length == 17
+        assert b"".join(virtual_file.iter_bytes()) == b"abcHELLO WORLDxyz"
+        assert b"".join(virtual_file.iter_bytes(2, 6)) == b"cHEL"
+        assert b"".join(virtual_file.iter_bytes(3, 14)) == b"HELLO WORLD"
+        assert b"".join(virtual_file.iter_bytes(13, 100)) == b"Dxyz"
+        assert b"".join(virtual_file.iter_bytes(17)) == b""
+
+
+class TestRangeCache:
+    def test_evicts_least_recently_used(self):
+        cache = RangeCache(max_bytes=10, max_entry_bytes=5)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        assert cache.get("a") == b"aaaa"
+        cache.put("c", b"cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.size == 8
+
+    def test_skips_large_entries(self):
+        cache = RangeCache(max_bytes=10, max_entry_bytes=5)
+        cache.put("a", b"aaaaaa")
+        assert len(cache) == 0
+
+
+@pytest.fixture
+def server(parts):
+    calls = []
+
+    def parts_for(week, day):
+        calls.append((week, day))
+        if week == 2:
+            raise DownloadError("Failed to download audio for Exodus 1")
+        if week == 3:
+            raise ValueError("ESV_API_KEY environment variable is not set.")
+        return parts if (week, day) == (1, 3) else None
+
+    server = EpisodeServer(("127.0.0.1", 0), parts_for=parts_for)
+    server.calls = calls
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestEpisodeServer:
+    def test_serves_whole_episode(self, server):
+        response = requests.get(f"{server.url}/readings/W01_D03.mp3")
+        assert response.status_code == 200
+        assert response.content == b"abcHELLO WORLDxyz"
+        assert response.headers["Content-Length"] == "17"
+        assert response.headers["Content-Type"] == "audio/mpeg"
+        assert response.headers["Accept-Ranges"] == "bytes"
+
+    def test_serves_ranges(self, server):
+        response = requests.get(f"{server.url}/readings/W01_D03.mp3", headers={"Range": "bytes=5-8"})
+        assert response.status_code == 206
+        assert response.content == b"LLO "
+        assert response.headers["Content-Range"] == "bytes 5-8/17"
+
+        response = requests.get(f"{server.url}/readings/W01_D03.mp3", headers={"Range": "bytes=20-"})
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == "bytes */17"
+
+    def test_caches_ranges_and_plans(self, server):
+        for _ in range(3):
+            response = requests.get(f"{server.url}/readings/W01_D03.mp3", headers={"Range": "bytes=0-3"})
+            assert response.content == b"abcH"
+
+        assert server.calls == [(1, 3)]
+        assert server.range_cache.get(("/readings/W01_D03.mp3", 0, 4)) == b"abcH"
+
+    def test_head(self, server):
+        response = requests.head(f"{server.url}/readings/W01_D03.mp3")
+        assert response.status_code == 200
+        assert response.headers["Content-Length"] == "17"
+        assert response.content == b""
+
+    def test_unknown_paths(self, server):
+        assert requests.get(f"{server.url}/readings/W60_D01.mp3").status_code == 404
+        assert requests.get(f"{server.url}/podcast-2025.xml").status_code == 404
+
+    def test_keeps_the_given_cache(self):
+        range_cache = RangeCache(max_bytes=5 * 1024 * 1024)
+        server = EpisodeServer(("127.0.0.1", 0), range_cache=range_cache)
+        server.server_close()
+        assert server.range_cache is range_cache
+
+    def test_build_failures_get_an_error_response(self, server):
+        assert requests.get(f"{server.url}/readings/W02_D01.mp3").status_code == 503
+        assert requests.get(f"{server.url}/readings/W03_D01.mp3").status_code == 500
+        assert requests.get(f"{server.url}/readings/W01_D03.mp3").status_code == 200
+
+
+def test_episode_parts_rejects_unknown_episodes():
+    from bible_reading_plan.utils.episode_server import episode_parts
+
+    assert episode_parts(53, 1) is None
+    assert episode_parts(1, 6) is None
@@ -0,0 +1,297 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+import pytest
+
+from bible_reading_plan.utils.artifact_index import ArtifactIndex
+from bible_reading_plan.utils.esv_downloader import (
+    DownloadError,
+    ESVDownloader,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class StubESVServer:
+    """
+    Local HTTP server standing in for the ESV audio endpoint.
+
+    Supports single Range requests, and If-None-Match for queries with an
+    entry in `etags`. `failures` queues error statuses per query, and
+    `truncations` queues byte counts after which a response is cut off, as
+    when a connection drops mid-download.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.range_headers = []
+        self.failures = {}
+        self.truncations = {}
+        self.bodies = {}
+        self.etags = {}
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append((self.path, self.headers.get("Authorization")))
+                    stub.range_headers.append(self.headers.get("Range"))
+                    query = self.path.split("q=", 1)[-1]
+                    pending = stub.failures.get(query, [])
+                    status = pending.pop(0) if pending else 200
+                    cuts = stub.truncations.get(query, [])
+                    cut = cuts.pop(0) if cuts else None
+                    body = stub.bodies.get(query, f"audio for {query}".encode())
+                    etag = stub.etags.get(query)
+
+                if status != 200:
+                    self.send_response(status)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                start = 0
+                requested = self.headers.get("Range")
+                if requested:
+                    start = int(requested.removeprefix("bytes=").rstrip("-"))
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(body)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Type", "audio/mpeg")
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body) - start))
+                self.end_headers()
+                sent = body[start:] if cut is None else body[start:start + cut]
+                self.wfile.write(sent)
+                if cut is not None:
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/audio/"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubESVServer()
+    yield server
+    server.close()
+
+
+def make_downloader(url, **kwargs):
+    kwargs.setdefault("rate_limiter", RateLimiter(quotas=[(1000, 1)]))
+    return ESVDownloader(api_key="test-key", base_url=url, backoff=0, **kwargs)
+
+
+class TestTokenBucket:
+    def test_allows_burst_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(3, 60, clock)
+        for _ in range(3):
+            assert bucket.wait_time() == 0
+            bucket.take()
+        assert bucket.wait_time() == pytest.approx(20)
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, 10, clock)
+        bucket.take()
+        bucket.take()
+        clock.now += 5
+        assert bucket.wait_time() == 0
+
+
+class TestRateLimiter:
+    def test_waits_for_strictest_bucket(self):
+        clock = FakeClock()
+        limiter = RateLimiter(quotas=[(2, 60), (100, 3600)], clock=clock, sleep=clock.sleep)
+        for _ in range(4):
+            limiter.acquire()
+        assert clock.now == pytest.approx(60)
+
+    def test_raises_when_quota_exhausted(self):
+        clock = FakeClock()
+        limiter = RateLimiter(quotas=[(1, 86400)], max_wait=300, clock=clock, sleep=clock.sleep)
+        limiter.acquire()
+        with pytest.raises(DownloadError, match="quota exhausted"):
+            limiter.acquire()
+
+
+class TestESVDownloader:
+    def test_download_writes_file(self, stub_server, tmp_path):
+        downloader = make_downloader(stub_server.url)
+        path = tmp_path / "esv_chapters" / "Genesis_1.mp3"
+
+        downloader.download("Genesis 1", str(path))
+
+        assert path.read_bytes() == b"audio for Genesis+1"
+        assert stub_server.requests == [("/audio/?q=Genesis+1", "Token test-key")]
+
+    def test_retries_throttled_and_server_errors(self, stub_server, tmp_path):
+        stub_server.failures["Mark+1"] = [429, 503]
+        downloader = make_downloader(stub_server.url)
+        path = tmp_path / "Mark_1.mp3"
+
+        downloader.download("Mark 1", str(path))
+
+        assert path.read_bytes() == b"audio for Mark+1"
+        assert len(stub_server.requests) == 3
+
+    def test_gives_up_after_max_retries(self, stub_server, tmp_path):
+        stub_server.failures["Mark+2"] = [500] * 5
+        downloader = make_downloader(stub_server.url, max_retries=2)
+
+        with pytest.raises(DownloadError, match="Failed to download audio for Mark 2"):
+            downloader.download("Mark 2", str(tmp_path / "Mark_2.mp3"))
+        assert len(stub_server.requests) == 3
+
+    def test_does_not_retry_client_errors(self, stub_server, tmp_path):
+        stub_server.failures["Mark+3"] = [404]
+        downloader = make_downloader(stub_server.url)
+
+        with pytest.raises(DownloadError):
+            downloader.download("Mark 3", str(tmp_path / "Mark_3.mp3"))
+        assert len(stub_server.requests) == 1
+
+    def test_download_many(self, stub_server, tmp_path):
+        downloader = make_downloader(stub_server.url, max_workers=4)
+        chapters = [f"Psalm {n}" for n in range(1, 21)]
+        downloads = [(chapter, str(tmp_path / f"{chapter}.mp3")) for chapter in chapters]
+
+        paths = downloader.download_many(downloads)
+
+        assert paths == [path for _, path in downloads]
+        for chapter, path in downloads:
+            with open(path, "rb") as f:
+                assert f.read() == f"audio for {chapter.replace(' ', '+')}".encode()
+        assert len(stub_server.requests) == 20
+
+
+class TestResumableDownloads:
+    BODY = bytes(range(256)) * 400
+
+    def test_resumes_after_connection_drops(self, stub_server, tmp_path):
+        stub_server.bodies["John+1"] = self.BODY
+        stub_server.truncations["John+1"] = [30000, 40000]
+        path = tmp_path / "John_1.mp3"
+
+        make_downloader(stub_server.url, chunk_size=1000).download("John 1", str(path))
+
+        assert path.read_bytes() == self.BODY
+        assert stub_server.range_headers == [None, "bytes=30000-", "bytes=70000-"]
+        assert not (tmp_path / "John_1.mp3.part").exists()
+
+    def test_never_leaves_a_truncated_file(self, stub_server, tmp_path):
+        stub_server.bodies["John+2"] = self.BODY
+        stub_server.truncations["John+2"] = [1000] * 3
+        path = tmp_path / "John_2.mp3"
+
+        with pytest.raises(DownloadError, match="Failed to download audio for John 2"):
+            make_downloader(stub_server.url, max_retries=2, chunk_size=1000).download("John 2", str(path))
+
+        assert not path.exists()
+        assert (tmp_path / "John_2.mp3.part").stat().st_size == 3000
+
+        # A later run picks up where the last one stopped
+        make_downloader(stub_server.url).download("John 2", str(path))
+        assert path.read_bytes() == self.BODY
+        assert stub_server.range_headers[-1] == "bytes=3000-"
+
+    def test_restarts_unresumable_partial_file(self, stub_server, tmp_path):
+        stub_server.bodies["John+3"] = b"short audio"
+        path = tmp_path / "John_3.mp3"
+        (tmp_path / "John_3.mp3.part").write_bytes(b"stale partial download from elsewhere")
+
+        make_downloader(stub_server.url).download("John 3", str(path))
+
+        assert path.read_bytes() == b"short audio"
+        assert stub_server.range_headers == ["bytes=37-", None]
+
+
+class TestRefresh:
+    def _downloader(self, stub_server, tmp_path):
+        index = ArtifactIndex(str(tmp_path / "esv_chapters.json"))
+        return make_downloader(stub_server.url, chapter_index=index), index
+
+    def test_records_validators(self, stub_server, tmp_path):
+        stub_server.etags["Luke+1"] = '"v1"'
+        downloader, index = self._downloader(stub_server, tmp_path)
+        path = str(tmp_path / "Luke_1.mp3")
+
+        downloader.download("Luke 1", path)
+
+        values = index.get(path)
+        assert values["etag"] == '"v1"'
+        assert values["size"] == len(b"audio for Luke+1")
+        assert "fetched_at" in values
+
+    def test_unchanged_audio_is_not_downloaded_again(self, stub_server, tmp_path):
+        stub_server.etags["Luke+2"] = '"v1"'
+        downloader, index = self._downloader(stub_server, tmp_path)
+        path = str(tmp_path / "Luke_2.mp3")
+        downloader.download("Luke 2", path)
+
+        assert downloader.refresh("Luke 2", path) is False
+        assert stub_server.requests[-1] == ("/audio/?q=Luke+2", "Token test-key")
+        assert index.get(path)["etag"] == '"v1"'
+
+    def test_changed_audio_is_replaced(self, stub_server, tmp_path):
+        stub_server.etags["Luke+3"] = '"v1"'
+        downloader, index = self._downloader(stub_server, tmp_path)
+        path = str(tmp_path / "Luke_3.mp3")
+        downloader.download("Luke 3", path)
+
+        stub_server.etags["Luke+3"] = '"v2"'
+        stub_server.bodies["Luke+3"] = b"re-recorded audio"
+        assert downloader.refresh("Luke 3", path) is True
+
+        with open(path, "rb") as f:
+            assert f.read() == b"re-recorded audio"
+        assert index.get(path)["etag"] == '"v2"'
+
+    def test_compares_content_without_validators(self, stub_server, tmp_path):
+        downloader, _ = self._downloader(stub_server, tmp_path)
+        path = tmp_path / "Luke_4.mp3"
+        path.write_bytes(b"audio for Luke+4")
+
+        assert downloader.refresh_many([("Luke 4", str(path))]) == []
+        path.write_bytes(b"old audio")
+        assert downloader.refresh_many([("Luke 4", str(path))]) == [str(path)]
+        assert path.read_bytes() == b"audio for Luke+4"
@@ -0,0 +1,72 @@
+import pytest
+import requests
+
+from bible_reading_plan.utils.http_retry import retry_delay, send_with_retries
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error")
+
+
+class RetryError(Exception):
+    pass
+
+
+def send_all(outcomes, **kwargs):
+    """Send with each call taking the next outcome; return (result, sleeps)."""
+    outcomes = list(outcomes)
+    sleeps = []
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    kwargs.setdefault("max_retries", 3)
+    result = send_with_retries(
+        send, lambda message: RetryError(message), backoff=1.0, sleep=sleeps.append, **kwargs
+    )
+    return result, sleeps
+
+
+def test_retry_delay():
+    assert retry_delay(0, 1.0) == 1.0
+    assert retry_delay(3, 0.5) == 4.0
+    assert retry_delay(3, 0.5, FakeResponse(429, {"Retry-After": "7"})) == 7.0
+    assert retry_delay(1, 1.0, FakeResponse(503, {"Retry-After": "soon"})) == 2.0
+
+
+def test_retries_error_statuses_and_connection_errors():
+    throttled = FakeResponse(429, {"Retry-After": "5"})
+    ok = FakeResponse(200)
+
+    response, sleeps = send_all([throttled, requests.exceptions.ConnectionError("reset"), ok])
+
+    assert response is ok
+    assert throttled.closed
+    assert sleeps == [5.0, 2.0]
+
+
+def test_raises_the_given_error():
+    with pytest.raises(RetryError, match="404 Error"):
+        send_all([FakeResponse(404)])
+    with pytest.raises(RetryError, match="503 Error"):
+        send_all([FakeResponse(503)] * 3, max_retries=2)
+    with pytest.raises(RetryError, match="timed out"):
+        send_all([requests.exceptions.Timeout("timed out")] * 2, max_retries=1)
+
+
+def test_returns_accepted_statuses():
+    response, _ = send_all([FakeResponse(416)], accept_statuses={416})
+    assert response.status_code == 416
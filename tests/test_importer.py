@@ -0,0 +1,132 @@
+import datetime
+
+import pytest
+
+from bible_reading_plan.cli import importer
+from bible_reading_plan.utils.todoist_sync import ImportCheckpoint, SyncError
+
+FIRST_MONDAY = datetime.datetime(2024, 12, 30)
+
+
+def project_items(todoist_server, project_id="project-1"):
+    return [item for item in todoist_server.items.values() if item["project_id"] == project_id]
+
+
+class TestImportReadings:
+    def test_imports_whole_plan_in_batches(self, todoist_server, capsys):
+        added = importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+
+        assert added == 260
+        assert len(todoist_server.command_requests()) == 3
+
+        items = sorted(todoist_server.items.values(), key=lambda item: int(item["id"]))
+        assert items[0]["content"] == "Read Genesis 1-2; Psalm 19; and Mark 1"
+        assert items[0]["due"] == {"date": "2024-12-30"}
+        assert items[0]["project_id"] == "project-1"
+        assert items[-1]["due"] == {"date": "2025-12-26"}
+        assert "Added 260 of 260 readings" in capsys.readouterr().out
+
+    def test_rerun_adds_nothing(self, todoist_server):
+        importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+        added = importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+
+        assert added == 0
+        assert len(project_items(todoist_server)) == 260
+        assert len(todoist_server.command_requests()) == 3
+
+    def test_only_adds_missing_tasks(self, todoist_server):
+        todoist_server.add_item("Read Genesis 1-2; Psalm 19; and Mark 1", "project-1", "2024-12-30")
+        todoist_server.add_item("Read Genesis 1-2; Psalm 19; and Mark 1", "other-project", "2024-12-30")
+
+        added = importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+
+        assert added == 259
+        assert len(project_items(todoist_server)) == 260
+
+    def test_resumes_after_failure(self, todoist_server, tmp_path):
+        checkpoint_path = str(tmp_path / "import.json")
+        # The bulk read and the first batch succeed, then the second batch fails
+        todoist_server.failures = [None, None, 500]
+        with pytest.raises(SyncError):
+            importer.import_readings(
+                todoist_server.sync(max_retries=0), "project-1", FIRST_MONDAY,
+                ImportCheckpoint(checkpoint_path),
+            )
+        assert len(project_items(todoist_server)) == 100
+
+        added = importer.import_readings(
+            todoist_server.sync(), "project-1", FIRST_MONDAY, ImportCheckpoint(checkpoint_path)
+        )
+
+        assert added == 160
+        assert len(project_items(todoist_server)) == 260
+
+    def test_retried_batch_is_not_applied_twice(self, todoist_server):
+        # The first batch is applied but its response is lost
+        todoist_server.failures = [None, (500, "after")]
+        importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+
+        assert len(project_items(todoist_server)) == 260
+
+    def test_completed_tasks_are_not_added_again(self, todoist_server, tmp_path):
+        checkpoint_path = str(tmp_path / "import.json")
+        importer.import_readings(
+            todoist_server.sync(), "project-1", FIRST_MONDAY, ImportCheckpoint(checkpoint_path)
+        )
+        for item in list(todoist_server.items.values())[:10]:
+            item["checked"] = True
+
+        added = importer.import_readings(
+            todoist_server.sync(), "project-1", FIRST_MONDAY, ImportCheckpoint(checkpoint_path)
+        )
+
+        assert added == 0
+        assert len(project_items(todoist_server)) == 260
+
+
+class TestRescheduleReadings:
+    def _import_and_complete(self, todoist_server, completed):
+        importer.import_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+        items = sorted(project_items(todoist_server), key=lambda item: int(item["id"]))
+        for item in items[:completed]:
+            item["checked"] = True
+        return items
+
+    def test_moves_uncompleted_readings_onto_weekdays(self, todoist_server, capsys):
+        items = self._import_and_complete(todoist_server, completed=12)
+        todoist_server.add_item("Buy milk", "project-1", "2025-01-01")
+        requests_before = len(todoist_server.requests)
+
+        moved = importer.reschedule_readings(
+            todoist_server.sync(), "project-1", datetime.datetime(2025, 1, 23)
+        )
+
+        assert moved == 248
+        # One bulk read, then 248 updates in three batches
+        assert len(todoist_server.requests) - requests_before == 4
+        assert items[11]["due"] == {"date": "2025-01-14"}
+        assert items[12]["due"] == {"date": "2025-01-23"}  # Thursday
+        assert items[13]["due"] == {"date": "2025-01-24"}
+        assert items[14]["due"] == {"date": "2025-01-27"}  # the following Monday
+        assert items[-1]["due"] == {"date": "2026-01-05"}
+        assert todoist_server.items[str(len(todoist_server.items))]["due"] == {"date": "2025-01-01"}
+        assert "248 uncompleted readings, 248 to reschedule" in capsys.readouterr().out
+
+    def test_weekend_start_moves_to_monday(self, todoist_server):
+        items = self._import_and_complete(todoist_server, completed=0)
+
+        importer.reschedule_readings(
+            todoist_server.sync(), "project-1", datetime.datetime(2025, 1, 4)
+        )
+
+        assert items[0]["due"] == {"date": "2025-01-06"}
+        assert items[5]["due"] == {"date": "2025-01-13"}
+
+    def test_skips_readings_already_on_schedule(self, todoist_server):
+        self._import_and_complete(todoist_server, completed=0)
+        requests_before = len(todoist_server.requests)
+
+        moved = importer.reschedule_readings(todoist_server.sync(), "project-1", FIRST_MONDAY)
+
+        assert moved == 0
+        assert len(todoist_server.requests) - requests_before == 1
@@ -0,0 +1,56 @@
+import os
+
+from bible_reading_plan.utils.loaders import clear_cache, load_cached
+
+
+class TestLoadCached:
+    def setup_method(self):
+        clear_cache()
+
+    def test_parses_once_while_unchanged(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_text("one")
+        calls = []
+
+        def parse(p):
+            calls.append(p)
+            return open(p).read()
+
+        assert load_cached(str(path), parse) == "one"
+        assert load_cached(str(path), parse) == "one"
+        assert len(calls) == 1
+
+    def test_reparses_when_mtime_changes(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_text("one")
+        parse = lambda p: open(p).read()
+        assert load_cached(str(path), parse) == "one"
+
+        path.write_text("two")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert load_cached(str(path), parse) == "two"
+
+    def test_separate_parsers_are_cached_separately(self, tmp_path):
+        path = tmp_path / "data.txt"
+        path.write_text("abc")
+        assert load_cached(str(path), lambda p: open(p).read()) == "abc"
+        assert load_cached(str(path), lambda p: len(open(p).read())) == 3
+
+
+class TestReadingsLoading:
+    def test_readings_load_from_any_directory(self, tmp_path, monkeypatch):
+        from bible_reading_plan.utils.readings import readings
+
+        monkeypatch.chdir(tmp_path)
+        lines = readings()
+        assert len(lines) == 260
+        assert lines[0] == "Genesis 1-2; Psalm 19; Mark 1"
+
+    def test_readings_returns_a_fresh_list(self):
+        from bible_reading_plan.utils.readings import readings
+
+        lines = readings()
+        lines.clear()
+        assert len(readings()) == 260
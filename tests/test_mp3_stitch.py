@@ -0,0 +1,97 @@
+import pytest
+
+from bible_reading_plan.utils.mp3_stitch import (
+    SILENT_FRAME,
+    AudioSpan,
+    FilePart,
+    audio_span,
+    file_audio_span,
+    info_frame,
+    read_part,
+    silent_frames,
+    stitch_plan,
+    write_parts,
+)
+from bible_reading_plan.utils.podcast_segments import mp3_duration, parse_frame_header
+
+from .test_podcast_segments import mp3_frame
+
+FRAME_SECONDS = 1152 / 44100
+
+
+def frames(count):
+    return b"".join(mp3_frame(padding=n % 2, payload=bytes([n % 256])) for n in range(count))
+
+
+class TestFrames:
+    def test_silent_frame_is_in_stitch_profile(self):
+        frame = parse_frame_header(SILENT_FRAME)
+        assert (frame.bitrate, frame.sample_rate, frame.mono) == (128000, 44100, True)
+        assert len(SILENT_FRAME) == frame.length == 417
+
+    def test_silent_frames(self):
+        assert silent_frames(1000) == SILENT_FRAME * 38
+        assert silent_frames(0) == b""
+
+    def test_info_frame(self):
+        frame = info_frame(1000, 418000)
+        assert len(frame) == 417
+        assert frame[21:25] == b"Info"
+        assert int.from_bytes(frame[29:33], "big") == 1000
+        assert int.from_bytes(frame[33:37], "big") == 418000
+
+
+class TestAudioSpan:
+    def test_plain_frames(self):
+        assert audio_span(frames(10)) == AudioSpan(0, len(frames(10)), 10)
+
+    def test_skips_tags_and_info_frame(self):
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x01\x00" + b"\x00" * 128
+        id3v1 = b"TAG" + b"\x00" * 125
+        data = id3v2 + info_frame(10, 0) + frames(10) + id3v1
+        assert audio_span(data) == AudioSpan(138 + 417, len(frames(10)), 10)
+
+    def test_drops_truncated_final_frame(self):
+        data = frames(10)
+        assert audio_span(data[:-100]).frames == 9
+
+    def test_rejects_other_profiles(self):
+        with pytest.raises(ValueError, match="not 44.1 kHz mono 128 kbps"):
+            audio_span(frames(2) + mp3_frame(bitrate_index=5))
+        with pytest.raises(ValueError, match="not 44.1 kHz mono 128 kbps"):
+            audio_span(mp3_frame(mono=False))
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError, match="does not start with an MP3 frame"):
+            audio_span(b"not an mp3 file")
+        with pytest.raises(ValueError, match="invalid MP3 frame at byte 417"):
+            audio_span(mp3_frame() + b"garbage" * 100)
+
+
+class TestStitching:
+    def test_stitched_file_has_correct_info_header(self, tmp_path):
+        source = tmp_path / "source.mp3"
+        source.write_bytes(b"ID3\x04\x00\x00\x00\x00\x00\x00" + frames(20))
+        span = file_audio_span(str(source))
+        part = FilePart(str(source), span.offset, span.length, span.frames)
+
+        parts = stitch_plan([silent_frames(1000), part, b"", silent_frames(1000)])
+        output = tmp_path / "episode.mp3"
+        write_parts(parts, str(output))
+
+        data = output.read_bytes()
+        assert data == parts[0] + SILENT_FRAME * 38 + frames(20) + SILENT_FRAME * 38
+        assert int.from_bytes(data[29:33], "big") == 96
+        assert int.from_bytes(data[33:37], "big") == len(data)
+        assert mp3_duration(str(output)) == pytest.approx(96 * FRAME_SECONDS)
+        assert audio_span(data).frames == 96
+
+    def test_read_part_ranges(self, tmp_path):
+        source = tmp_path / "source.mp3"
+        source.write_bytes(b"0123456789")
+        part = FilePart(str(source), 2, 6, 0)
+
+        assert b"".join(read_part(part)) == b"234567"
+        assert b"".join(read_part(part, 1, 4)) == b"345"
+        assert b"".join(read_part(part, 3, 100)) == b"567"
+        assert b"".join(read_part(b"abcdef", 2, 4)) == b"cd"
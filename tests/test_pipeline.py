@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from bible_reading_plan.utils.pipeline import Pipeline, Stage
+
+
+class TestPipeline:
+    def test_runs_items_through_every_stage(self):
+        pipeline = Pipeline([Stage("double", lambda x: x * 2), Stage("inc", lambda x: x + 1)])
+        results = pipeline.run(range(10))
+
+        assert results == [x * 2 + 1 for x in range(10)]
+        assert [stage.processed for stage in pipeline.stages] == [10, 10]
+
+    def test_multiple_workers(self):
+        pipeline = Pipeline([Stage("square", lambda x: x * x, workers=4), Stage("id", lambda x: x, workers=3)])
+        assert sorted(pipeline.run(range(50))) == [x * x for x in range(50)]
+
+    def test_stages_overlap(self):
+        second_item_fetched = threading.Event()
+
+        def fetch(item):
+            if item == 1:
+                second_item_fetched.set()
+            return item
+
+        def encode(item):
+            # Item 0 is encoded only once item 1 has been fetched
+            if item == 0:
+                assert second_item_fetched.wait(timeout=5)
+            return item
+
+        pipeline = Pipeline([Stage("fetch", fetch), Stage("encode", encode)])
+        assert pipeline.run(range(3)) == [0, 1, 2]
+
+    def test_queues_are_bounded(self):
+        depths = []
+
+        def slow(item):
+            depths.append(pipeline.queue_depths())
+            time.sleep(0.005)
+            return item
+
+        pipeline = Pipeline([Stage("fast", lambda x: x), Stage("slow", slow)], queue_size=2)
+        pipeline.run(range(20))
+
+        assert max(depth for sample in depths for depth in sample) <= 2
+
+    def test_errors_stop_the_pipeline(self):
+        processed = []
+
+        def fail_on_three(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        pipeline = Pipeline([Stage("check", fail_on_three), Stage("record", processed.append)])
+        with pytest.raises(ValueError, match="bad item"):
+            pipeline.run(range(100))
+
+        assert 3 not in processed
+        assert len(processed) < 100
+
+    def test_reports_status(self):
+        statuses = []
+        pipeline = Pipeline([Stage("fetch", lambda x: time.sleep(0.01) or x)])
+        pipeline.run(range(5), report=statuses.append, report_interval=0.02)
+
+        assert statuses
+        assert "fetch" in statuses[0] and "/s)" in statuses[0]
+        assert "fetch 5 (" in pipeline.status()
+
+    def test_on_result(self):
+        seen = []
+        Pipeline([Stage("id", lambda x: x)]).run([1, 2], on_result=seen.append)
+        assert seen == [1, 2]
+
+    def test_stage_needs_a_worker(self):
+        with pytest.raises(ValueError):
+            Stage("none", lambda x: x, workers=0)
@@ -0,0 +1,42 @@
+import pytest
+
+from bible_reading_plan.utils.bible_books import TOTAL_CHAPTERS, chapter_id_from_name, chapter_name
+from bible_reading_plan.utils.plan_coverage import (
+    ChapterCoverage,
+    plan_chapter_ids,
+    plan_coverage,
+    validate_plan,
+)
+from bible_reading_plan.utils.readings import readings
+
+
+def test_packaged_plan_reads_every_chapter_once():
+    validate_plan()
+    assert plan_coverage().is_complete()
+
+
+def test_plan_chapter_ids_per_day():
+    days = plan_chapter_ids()
+    assert len(days) == 260
+    assert [chapter_name(c) for c in days[0]] == ["Genesis 1", "Genesis 2", "Psalm 19", "Mark 1"]
+    assert sum(len(day) for day in days) == TOTAL_CHAPTERS
+
+
+def test_coverage_reports_missing_and_duplicates():
+    coverage = ChapterCoverage()
+    coverage.add_all([chapter_id_from_name(name) for name in ["Genesis 1", "Genesis 1", "Exodus 2"]])
+
+    assert not coverage.is_complete()
+    assert [chapter_name(c) for c in coverage.duplicates()] == ["Genesis 1"]
+    missing = coverage.missing()
+    assert len(missing) == TOTAL_CHAPTERS - 2
+    assert chapter_name(missing[0]) == "Genesis 2"
+
+
+def test_validate_plan_rejects_gaps_and_overlaps():
+    lines = readings()
+    lines[1] = "Gen 3-4; Mark 2"  # drops Genesis 5
+    lines[2] = "Gen 6-8; Psalm 104; Mark 3; Mark 1"
+
+    with pytest.raises(ValueError, match=r"1 missing: Genesis 5; 1 read more than once: Mark 1"):
+        validate_plan(lines)
@@ -0,0 +1,322 @@
+import datetime
+import unittest.mock as mock
+
+import pytest
+
+from bible_reading_plan.cli import podcast_builder
+from bible_reading_plan.utils.readings import readings_with_dates
+
+
+class TestBuildAudioFiles:
+    def _scheduled_readings(self):
+        return readings_with_dates(datetime.datetime(2024, 12, 30))
+
+    def test_counts_generated_and_cached_episodes(self, capsys):
+        def fake_build(scheduled_reading, force=False, assembly=None):
+            return scheduled_reading.day % 2 == 1
+
+        with mock.patch.object(
+            podcast_builder, "get_scheduled_readings_for_year",
+            return_value=self._scheduled_readings(),
+        ), mock.patch.object(podcast_builder, "build_episode", side_effect=fake_build), \
+             mock.patch.object(podcast_builder, "download_esv_chapters"), \
+             mock.patch.object(podcast_builder, "synthesize_speech"):
+            podcast_builder.build_audio_files(2025, count=10, jobs=4)
+
+        output = capsys.readouterr().out
+        progress = output.splitlines()[0]
+        assert sorted(progress) == sorted("*.*.**.*.*")
+        assert "Build complete: 6 generated, 4 cached (total: 10)" in output
+
+    def test_builds_every_episode_once(self):
+        built = []
+
+        def fake_build(scheduled_reading, force=False, assembly=None):
+            built.append((scheduled_reading.week, scheduled_reading.day, force))
+            assert assembly == "single-pass"
+            return True
+
+        with mock.patch.object(
+            podcast_builder, "get_scheduled_readings_for_year",
+            return_value=self._scheduled_readings(),
+        ), mock.patch.object(podcast_builder, "build_episode", side_effect=fake_build), \
+             mock.patch.object(podcast_builder, "download_esv_chapters"), \
+             mock.patch.object(podcast_builder, "synthesize_speech"):
+            podcast_builder.build_audio_files(2025, force=True, jobs=8)
+
+        assert len(built) == 260
+        assert len(set(built)) == 260
+        assert all(force for _, _, force in built)
+
+
+    def test_fetches_and_synthesizes_only_for_episodes_without_audio(self):
+        def has_audio(path):
+            return path.endswith("_D01.mp3")
+
+        with mock.patch.object(
+            podcast_builder, "get_scheduled_readings_for_year",
+            return_value=self._scheduled_readings(),
+        ), mock.patch.object(podcast_builder, "build_episode", return_value=False), \
+             mock.patch.object(podcast_builder.os.path, "exists", side_effect=has_audio), \
+             mock.patch.object(podcast_builder, "download_esv_chapters") as download, \
+             mock.patch.object(podcast_builder, "synthesize_speech") as synthesize:
+            podcast_builder.build_audio_files(2025, count=10)
+
+        days = [reading.day for reading in download.call_args[0][0]]
+        assert days == [2, 3, 4, 5, 2, 3, 4, 5]
+        assert synthesize.call_args[0][0] == download.call_args[0][0]
+
+
+    def test_cli_rejects_non_positive_jobs(self, capsys):
+        for command in [["build-audio", "-y", "2025"], ["refresh", "-y", "2025"], ["build-feed", "--all-years"]]:
+            for jobs in ["0", "-2"]:
+                with mock.patch("sys.argv", ["podcast-bible-plan", *command, "-j", jobs]), \
+                     pytest.raises(SystemExit) as exit_info:
+                    podcast_builder.main()
+                assert exit_info.value.code == 2
+                assert "must be at least 1" in capsys.readouterr().err
+
+
+class TestBuildAudioPipeline:
+    class FakeEpisode:
+        calls = []
+
+        def __init__(self, scheduled_reading):
+            self.day = scheduled_reading.day
+
+        def _record(self, step):
+            self.calls.append((self.day, step))
+
+        def file_path(self):
+            return f"build/readings/D{self.day}.mp3"
+
+        def is_built(self):
+            return self.day == 1
+
+        def invalidate(self):
+            self._record("invalidate")
+
+        def segments(self):
+            return []
+
+        def build_segments(self):
+            self._record("fetch")
+
+        def prepare_segments(self, assembly):
+            self._record(f"prepare {assembly}")
+
+        def assemble(self, segments, output_file, assembly):
+            self._record(f"assemble {assembly}")
+
+        def save_metadata(self):
+            self._record("metadata")
+
+    def test_runs_episodes_through_stages(self, capsys, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.FakeEpisode.calls = []
+        scheduled_readings = readings_with_dates(datetime.datetime(2024, 12, 30))[:5]
+
+        with mock.patch.object(podcast_builder, "PodcastEpisode", self.FakeEpisode):
+            generated, cached = podcast_builder.build_audio_pipeline(
+                scheduled_readings, assembly="stitch", jobs=2
+            )
+
+        assert (generated, cached) == (4, 1)
+        calls = self.FakeEpisode.calls
+        assert not [step for day, step in calls if day == 1]
+        for day in range(2, 6):
+            assert [step for d, step in calls if d == day] == [
+                "fetch", "prepare stitch", "assemble stitch", "metadata",
+            ]
+        output = capsys.readouterr().out
+        assert "[0/2] plan 5" in output
+        assert "assemble 5" in output
+
+    def test_build_audio_files_uses_pipeline(self, capsys):
+        with mock.patch.object(
+            podcast_builder, "get_scheduled_readings_for_year",
+            return_value=readings_with_dates(datetime.datetime(2024, 12, 30)),
+        ), mock.patch.object(podcast_builder, "build_audio_pipeline", return_value=(3, 7)) as pipeline, \
+             mock.patch.object(podcast_builder, "download_esv_chapters") as download:
+            podcast_builder.build_audio_files(2025, count=10, jobs=4, pipeline=True)
+
+        download.assert_not_called()
+        assert len(pipeline.call_args[0][0]) == 10
+        assert "Build complete: 3 generated, 7 cached (total: 10)" in capsys.readouterr().out
+
+
+class TestDownloadESVChapters:
+    def test_downloads_only_missing_chapters_once(self):
+        scheduled_readings = readings_with_dates(datetime.datetime(2024, 12, 30))[:3]
+        downloader = mock.Mock()
+
+        with mock.patch.object(podcast_builder, "default_downloader", return_value=downloader), \
+             mock.patch.object(podcast_builder.ESVReadingSegment, "is_built",
+                               lambda segment: segment.chapter == "Genesis 1"):
+            podcast_builder.download_esv_chapters(scheduled_readings + scheduled_readings)
+
+        downloads = downloader.download_many.call_args[0][0]
+        chapters = [chapter for chapter, _ in downloads]
+        assert chapters == [
+            "Genesis 2", "Psalm 19", "Mark 1", "Genesis 3", "Genesis 4",
+            "Genesis 5", "Mark 2", "Genesis 6", "Genesis 7", "Genesis 8",
+            "Psalm 104", "Mark 3",
+        ]
+        assert downloads[0][1] == "build/esv_chapters/Genesis_2.mp3"
+
+
+class TestRefreshAudioFiles:
+    def test_rebuilds_only_episodes_with_changed_chapters(self, capsys):
+        scheduled_readings = readings_with_dates(datetime.datetime(2024, 12, 30))[:5]
+        downloader = mock.Mock()
+        downloader.refresh_many.return_value = ["build/esv_chapters/Psalm_19.mp3"]
+        built = []
+
+        def fake_build(scheduled_reading, force=False, assembly=None):
+            built.append((scheduled_reading.day, force))
+            return True
+
+        with mock.patch.object(
+            podcast_builder, "get_scheduled_readings_for_year", return_value=scheduled_readings,
+        ), mock.patch.object(podcast_builder, "default_downloader", return_value=downloader), \
+             mock.patch.object(podcast_builder.ESVReadingSegment, "is_built", return_value=True), \
+             mock.patch.object(podcast_builder.os.path, "exists", return_value=True), \
+             mock.patch.object(podcast_builder, "build_episode", side_effect=fake_build):
+            podcast_builder.refresh_audio_files(2025, jobs=2)
+
+        refreshed = [chapter for chapter, _ in downloader.refresh_many.call_args[0][0]]
+        assert refreshed[:4] == ["Genesis 1", "Genesis 2", "Psalm 19", "Mark 1"]
+        assert built == [(1, True)]
+        assert "1 chapters changed; rebuilding 1 episodes" in capsys.readouterr().out
+
+
+class TestSynthesizeSpeech:
+    def test_synthesizes_each_unique_text_once(self, capsys):
+        scheduled_readings = readings_with_dates(datetime.datetime(2024, 12, 30))[:5]
+        built = []
+        cached_text = "<speak>Genesis chapter 1</speak>"
+
+        def fake_build(segment):
+            built.append(segment.text)
+
+        with mock.patch.object(podcast_builder.GeneratedSpeechSegment, "build", fake_build), \
+             mock.patch.object(podcast_builder.GeneratedSpeechSegment, "is_built",
+                               lambda segment: segment.text == cached_text):
+            podcast_builder.synthesize_speech(scheduled_readings + scheduled_readings)
+
+        # 5 intros plus one announcement per chapter (Genesis 1-15, Psalms 19,
+        # 104 and 148, Mark 1-5), less the cached announcement for Genesis 1
+        assert len(built) == len(set(built)) == 5 + 23 - 1
+        assert cached_text not in built
+        output = capsys.readouterr().out
+        assert "Speech: 28 unique utterances, 1 cached, 27 to synthesize" in output
+
+
+class TestLookupReading:
+    def test_prints_matches_for_each_year(self, capsys):
+        with mock.patch.object(podcast_builder, "load_podcast_config", return_value={
+            "years": {2025: {"start_date": "2024-12-30"}, 2026: {"start_date": "2025-12-29"}}
+        }):
+            podcast_builder.lookup_reading("Ps 23", [2025, 2026])
+
+        assert capsys.readouterr().out.splitlines() == [
+            "2025:",
+            "  Week 16, Day 4 (Thu 2025-04-17): 1 Samuel 3-5; Psalm 23; and Acts 6",
+            "2026:",
+            "  Week 16, Day 4 (Thu 2026-04-16): 1 Samuel 3-5; Psalm 23; and Acts 6",
+        ]
+
+    def test_cli_reports_invalid_queries(self, capsys):
+        config = {"years": {2025: {"start_date": "2024-12-30"}}}
+        for query in ["J 1", "Psalm 151", "Hezekiah 1"]:
+            with mock.patch.object(podcast_builder, "load_podcast_config", return_value=config), \
+                 mock.patch("sys.argv", ["podcast-bible-plan", "lookup", query]):
+                podcast_builder.main()
+
+            output = capsys.readouterr().out
+            assert output.startswith("Error: "), output
+
+
+class TestBuildPodcastFeed:
+    CONFIG = {"years": {2025: {"start_date": "2024-12-30"}, 2026: {"start_date": "2025-12-29"}}}
+
+    def _chdir_to_build_dir(self, tmp_path, monkeypatch):
+        import os
+        import shutil
+
+        repo_root = os.getcwd()
+        monkeypatch.chdir(tmp_path)
+        os.makedirs("static")
+        shutil.copy(os.path.join(repo_root, "static/podcast-logo.png"), "static/podcast-logo.png")
+        monkeypatch.setenv("GCS_BUCKET", "test-bucket")
+
+    def test_feed_items_for_year(self):
+        entries = [(f"Episode {n}", f"https://example.com/{n}.mp3", "") for n in range(260)]
+        with mock.patch.object(podcast_builder, "load_podcast_config", return_value=self.CONFIG):
+            items = podcast_builder.feed_items_for_year(
+                2026, entries, now=datetime.datetime(2026, 1, 3)
+            )
+
+        assert [item.title for item in items] == [f"Episode {n}" for n in range(5)]
+        assert items[0].pub_date == datetime.datetime(2025, 12, 29, tzinfo=datetime.timezone.utc)
+        assert items[-1].pub_date == datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+
+    def test_all_years_share_episode_entries(self, tmp_path, monkeypatch):
+        self._chdir_to_build_dir(tmp_path, monkeypatch)
+
+        with mock.patch.object(podcast_builder, "load_podcast_config", return_value=self.CONFIG), \
+             mock.patch.object(
+                 podcast_builder, "episode_feed_entries",
+                 wraps=podcast_builder.episode_feed_entries,
+             ) as entries:
+            podcast_builder.build_podcast_feeds([2025, 2026], jobs=2)
+
+        assert entries.call_count == 1
+        with open("build/podcast-2025.xml", "rb") as f:
+            feed_2025 = f.read()
+        with open("build/podcast-2026.xml", "rb") as f:
+            feed_2026 = f.read()
+        assert b"Five Day Bible Reading Plan (2025)" in feed_2025
+        assert b"Five Day Bible Reading Plan (2026)" in feed_2026
+        assert b"<pubDate>Mon, 30 Dec 2024 00:00:00 +0000</pubDate>" in feed_2025
+        assert b"<pubDate>Mon, 29 Dec 2025 00:00:00 +0000</pubDate>" in feed_2026
+
+    def test_loads_only_published_entries(self, tmp_path, monkeypatch):
+        self._chdir_to_build_dir(tmp_path, monkeypatch)
+
+        class FixedDatetime(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls(2025, 1, 8)
+
+        with mock.patch.object(podcast_builder, "load_podcast_config", return_value=self.CONFIG), \
+             mock.patch.object(podcast_builder, "datetime", FixedDatetime), \
+             mock.patch.object(
+                 podcast_builder, "episode_feed_entries",
+                 wraps=podcast_builder.episode_feed_entries,
+             ) as entries:
+            podcast_builder.build_podcast_feeds([2025, 2026])
+
+        assert len(entries.call_args[0][0]) == 8
+        with open("build/podcast-2025.xml", "rb") as f:
+            assert f.read().count(b"<item>") == 8
+        with open("build/podcast-2026.xml", "rb") as f:
+            assert f.read().count(b"<item>") == 0
+
+    def test_incremental_feed_matches_full_feed(self, tmp_path, monkeypatch):
+        self._chdir_to_build_dir(tmp_path, monkeypatch)
+
+        config = self.CONFIG
+        with mock.patch.object(podcast_builder, "load_podcast_config", return_value=config):
+            podcast_builder.build_podcast_feed(2025)
+            with open("build/podcast-2025.xml", "rb") as f:
+                full = f.read()
+
+            podcast_builder.build_podcast_feed(2025, incremental=True)
+            podcast_builder.build_podcast_feed(2025, incremental=True)
+            with open("build/podcast-2025.xml", "rb") as f:
+                incremental = f.read()
+
+        assert incremental == full
+        assert full.count(b"<item>") == 260
+        assert b"<lastBuildDate>Fri, 26 Dec 2025 00:00:00 +0000</lastBuildDate>" in full
@@ -4,6 +4,7 @@ import unittest.mock as mock
 
 import pytest
 
+from bible_reading_plan.utils.metadata_store import EpisodeMetadataStore
 from bible_reading_plan.utils.podcast_episode import PodcastEpisode, _create_chapter_announcement_text
 from bible_reading_plan.utils.readings import ScheduledReading
 
@@ -182,9 +183,9 @@ class TestSegmentsTitles:
 class TestMetadata:
     """Tests for episode metadata save/load functionality."""
 
-    def test_metadata_file_path(self):
+    def test_metadata_key(self):
         episode = PodcastEpisode(scheduled_reading)
-        assert episode.metadata_file_path() == "bible_reading_plan/metadata/episodes/W01_D03.json"
+        assert episode.metadata_key() == "W01_D03"
 
     def test_save_and_load_metadata(self, tmp_path):
         episode = PodcastEpisode(scheduled_reading)
@@ -209,33 +210,33 @@ class TestMetadata:
             MockSegment(180.0),
         ]
 
+        store = EpisodeMetadataStore(str(tmp_path / "episodes.json"))
         with mock.patch.object(episode, 'segments', return_value=mock_segments), \
-             mock.patch.object(episode, 'metadata_file_path', return_value=str(tmp_path / "test.json")):
+             mock.patch.object(episode, 'metadata_store', store):
 
             episode.save_metadata()
-            metadata = episode.load_metadata()
+            metadata = EpisodeMetadataStore(store.path).get("W01_D03")
 
             assert metadata is not None
+            assert metadata == episode.load_metadata()
             assert metadata["title"] == episode.title()
             assert metadata["description"] == "0:06 – Genesis 6"
             assert metadata["chapter_start_times"] == [[6.0, "Genesis 6"]]
+            assert metadata["duration"] == 189.0
 
-    def test_load_metadata_returns_none_when_file_missing(self, tmp_path):
+    def test_load_metadata_returns_none_when_missing(self, tmp_path):
         episode = PodcastEpisode(scheduled_reading)
+        store = EpisodeMetadataStore(str(tmp_path / "nonexistent.json"))
 
-        with mock.patch.object(episode, 'metadata_file_path', return_value=str(tmp_path / "nonexistent.json")):
+        with mock.patch.object(episode, 'metadata_store', store):
             assert episode.load_metadata() is None
 
     def test_get_description_uses_cached_metadata(self, tmp_path):
         episode = PodcastEpisode(scheduled_reading)
-        metadata_path = tmp_path / "test.json"
+        store = EpisodeMetadataStore(str(tmp_path / "episodes.json"))
+        store.put("W01_D03", {"description": "Cached description"})
 
-        # Write fake metadata
-        import json
-        with open(metadata_path, "w") as f:
-            json.dump({"description": "Cached description"}, f)
-
-        with mock.patch.object(episode, 'metadata_file_path', return_value=str(metadata_path)):
+        with mock.patch.object(episode, 'metadata_store', store):
             assert episode.get_description() == "Cached description"
 
     def test_get_description_falls_back_to_computed(self):
@@ -262,37 +263,301 @@ class TestMetadata:
             assert episode.get_description() == "0:05 – Genesis 6"
 
 
+class TestMetadataStore:
+    """Tests for the consolidated episode metadata store."""
+
+    def test_put_only_rewrites_on_change(self, tmp_path):
+        store = EpisodeMetadataStore(str(tmp_path / "episodes.json"))
+        assert store.put("W01_D01", {"title": "A", "chapter_start_times": [(1.0, "Genesis 1")]})
+        assert not store.put("W01_D01", {"title": "A", "chapter_start_times": [[1.0, "Genesis 1"]]})
+        assert store.put("W01_D01", {"title": "B", "chapter_start_times": []})
+        assert EpisodeMetadataStore(store.path).get("W01_D01")["title"] == "B"
+
+    def test_one_entry_per_line(self, tmp_path):
+        store = EpisodeMetadataStore(str(tmp_path / "episodes.json"))
+        store.put("W01_D02", {"title": "Week 1, Day 2 – B"})
+        store.put("W01_D01", {"title": "Week 1, Day 1 – A"})
+        with open(store.path, encoding="utf-8") as f:
+            assert f.read().splitlines() == [
+                "{",
+                '"W01_D01": {"title":"Week 1, Day 1 – A"},',
+                '"W01_D02": {"title":"Week 1, Day 2 – B"}',
+                "}",
+            ]
+
+    def test_migrate_from_episode_files(self, tmp_path):
+        import json
+
+        legacy_dir = tmp_path / "episodes"
+        legacy_dir.mkdir()
+        for key in ["W01_D01", "W01_D02"]:
+            with open(legacy_dir / f"{key}.json", "w") as f:
+                json.dump({"title": key, "description": "", "chapter_start_times": [[8.3, "Genesis 1"]]}, f)
+
+        store = EpisodeMetadataStore(str(tmp_path / "episodes.json"))
+        assert store.migrate_from(str(legacy_dir)) == 2
+
+        reloaded = EpisodeMetadataStore(store.path)
+        assert reloaded.keys() == ["W01_D01", "W01_D02"]
+        assert reloaded.get("W01_D02")["chapter_start_times"] == [[8.3, "Genesis 1"]]
+
+
 class TestMetadataFilesExist:
-    """Test that all expected metadata files are committed to the repo."""
+    """Test that metadata for every episode is committed to the repo."""
 
     TOTAL_WEEKS = 52
     DAYS_PER_WEEK = 5
 
-    def test_all_metadata_files_exist(self):
-        """Verify all 260 episode metadata files exist.
+    def test_all_metadata_entries_exist(self):
+        """Verify all 260 episodes have metadata in the store.
 
         If this test fails, run: podcast-bible-plan build-audio
-        to generate the missing metadata files, then commit them.
+        to generate the missing metadata, then commit the store.
         """
-        missing_files = []
-        metadata_dir = "bible_reading_plan/metadata/episodes"
-
-        for week in range(1, self.TOTAL_WEEKS + 1):
-            for day in range(1, self.DAYS_PER_WEEK + 1):
-                filename = f"W{week:02d}_D{day:02d}.json"
-                filepath = os.path.join(metadata_dir, filename)
-                if not os.path.exists(filepath):
-                    missing_files.append(filename)
-
-        if missing_files:
-            missing_count = len(missing_files)
-            sample = missing_files[:5]
+        store = EpisodeMetadataStore()
+        missing_keys = [
+            f"W{week:02d}_D{day:02d}"
+            for week in range(1, self.TOTAL_WEEKS + 1)
+            for day in range(1, self.DAYS_PER_WEEK + 1)
+            if store.get(f"W{week:02d}_D{day:02d}") is None
+        ]
+
+        if missing_keys:
+            missing_count = len(missing_keys)
+            sample = missing_keys[:5]
             sample_str = ", ".join(sample)
             if missing_count > 5:
                 sample_str += f", ... ({missing_count - 5} more)"
 
             pytest.fail(
-                f"Missing {missing_count} metadata file(s): {sample_str}\n\n"
+                f"Missing metadata for {missing_count} episode(s): {sample_str}\n\n"
                 f"To fix, run: podcast-bible-plan build-audio\n"
-                f"Then commit the generated files in {metadata_dir}/"
+                f"Then commit {store.path}"
             )
+
+
+class TestAssembly:
+    """Tests for the episode assembly modes."""
+
+    def _segments(self):
+        from bible_reading_plan.utils.podcast_segments import BufferSegment, ESVReadingSegment
+        return [BufferSegment(1000), ESVReadingSegment("Genesis 6"), BufferSegment(1000)]
+
+    def test_single_pass_decodes_concatenates_and_encodes_in_one_command(self):
+        episode = PodcastEpisode(scheduled_reading)
+        args = episode._single_pass_stream(self._segments(), "out.mp3").compile()
+
+        inputs = [args[i + 1] for i, arg in enumerate(args) if arg == "-i"]
+        assert sorted(inputs) == ["anullsrc=r=44100:cl=mono", "build/esv_chapters/Genesis_6.mp3"]
+        assert args[args.index("-f") + 1] == "lavfi"
+        filter_graph = args[args.index("-filter_complex") + 1]
+        assert "asplit=2" in filter_graph
+        assert "concat=a=1:n=3:v=0" in filter_graph
+        assert filter_graph.count("aformat=") == 2
+        assert args[-1] == "out.mp3"
+        assert not any(arg.endswith(".wav") for arg in args)
+
+    def test_build_uses_requested_assembly(self, tmp_path):
+        episode = PodcastEpisode(scheduled_reading)
+        output = str(tmp_path / "W01_D03.mp3")
+
+        with mock.patch.object(episode, "file_path", return_value=output), \
+             mock.patch.object(episode, "segments", return_value=[]), \
+             mock.patch.object(episode, "save_metadata"), \
+             mock.patch.object(episode, "_assemble_single_pass") as single_pass, \
+             mock.patch.object(episode, "_assemble_wav") as wav:
+            assert episode.build(force=True) is True
+            single_pass.assert_called_once_with([], output)
+            wav.assert_not_called()
+
+            episode.build(force=True, assembly="wav")
+            wav.assert_called_once_with([], output)
+
+    def test_stitch_encodes_each_source_once_and_copies_frames(self, tmp_path):
+        from bible_reading_plan.utils import podcast_episode
+        from bible_reading_plan.utils.artifact_index import ArtifactIndex
+        from bible_reading_plan.utils.mp3_stitch import SILENT_FRAME, audio_span
+        from bible_reading_plan.utils.podcast_segments import BufferSegment
+
+        from .test_podcast_segments import mp3_frame
+
+        source = tmp_path / "Genesis_6.mp3"
+        source.write_bytes(b"original chapter audio")
+        segment = mock.Mock(needs_file=True)
+        segment.file_path.return_value = str(source)
+        encoded = b"".join(mp3_frame(padding=n % 2) for n in range(50))
+
+        def fake_encode(output_path, **options):
+            assert options["reservoir"] == 0 and options["write_xing"] == 0
+            with open(output_path, "wb") as f:
+                f.write(encoded)
+            return mock.Mock()
+
+        episode = PodcastEpisode(scheduled_reading)
+        episode.MP3_CACHE_DIR = str(tmp_path / "mp3_cache")
+        segments = [BufferSegment(1000), segment, BufferSegment(3000)]
+
+        with mock.patch.object(podcast_episode, "content_hash_index", ArtifactIndex(str(tmp_path / "h.json"))), \
+             mock.patch.object(podcast_episode, "audio_span_index", ArtifactIndex(str(tmp_path / "s.json"))), \
+             mock.patch("ffmpeg.input") as ffmpeg_input:
+            ffmpeg_input.return_value.output.side_effect = fake_encode
+            episode.assemble(segments, str(tmp_path / "one.mp3"), "stitch")
+            episode.assemble(segments, str(tmp_path / "two.mp3"), "stitch")
+
+        ffmpeg_input.assert_called_once_with(str(source))
+        output = (tmp_path / "one.mp3").read_bytes()
+        assert output == (tmp_path / "two.mp3").read_bytes()
+        assert output[417:] == SILENT_FRAME * 38 + encoded + SILENT_FRAME * 115
+        assert audio_span(output).frames == 38 + 50 + 115
+        assert not [name for name in os.listdir(episode.MP3_CACHE_DIR) if name.endswith(".tmp")]
+
+    def test_prepare_segments_fills_the_assembly_cache(self):
+        episode = PodcastEpisode(scheduled_reading)
+        segments = self._segments()
+
+        with mock.patch.object(episode, "segments", return_value=segments), \
+             mock.patch.object(episode, "_normalize_segment") as normalize, \
+             mock.patch.object(episode, "_convert_segments_to_wav") as convert:
+            episode.prepare_segments("single-pass")
+            normalize.assert_not_called()
+            convert.assert_not_called()
+
+            episode.prepare_segments("stitch")
+            normalize.assert_called_once_with(segments[1])
+
+            episode.prepare_segments("wav")
+            convert.assert_called_once_with([segments[1]], None)
+
+    def test_build_rejects_unknown_assembly(self):
+        episode = PodcastEpisode(scheduled_reading)
+        with pytest.raises(ValueError, match="Unknown assembly mode"):
+            episode.build(assembly="bogus")
+
+
+class TestWavCache:
+    """Tests for fingerprinting segment MP3s in the WAV cache."""
+
+    def test_warm_rebuild_does_not_rehash_audio(self, tmp_path):
+        import hashlib
+
+        from bible_reading_plan.utils import podcast_episode
+        from bible_reading_plan.utils.artifact_index import ArtifactIndex
+
+        mp3_path = tmp_path / "Genesis_6.mp3"
+        mp3_path.write_bytes(b"chapter audio")
+        expected_hash = hashlib.md5(b"chapter audio").hexdigest()
+        wav_cache_dir = tmp_path / "wav_cache"
+        wav_cache_dir.mkdir()
+        (wav_cache_dir / f"{expected_hash}.wav").write_bytes(b"pcm")
+
+        segment = mock.Mock()
+        segment.file_path.return_value = str(mp3_path)
+        episode = PodcastEpisode(scheduled_reading)
+        episode.WAV_CACHE_DIR = str(wav_cache_dir)
+        index = ArtifactIndex(str(tmp_path / "content_hashes.json"))
+
+        with mock.patch.object(podcast_episode, "content_hash_index", index), \
+             mock.patch.object(podcast_episode, "_file_md5", wraps=podcast_episode._file_md5) as file_md5:
+            first = episode._convert_segments_to_wav([segment], None)
+            second = episode._convert_segments_to_wav([segment], None)
+
+            assert first == second == [str(wav_cache_dir / f"{expected_hash}.wav")]
+            assert file_md5.call_count == 1
+
+            mp3_path.write_bytes(b"re-recorded chapter audio")
+            with mock.patch("ffmpeg.input") as ffmpeg_input:
+                third = episode._convert_segments_to_wav([segment], None)
+
+            new_hash = hashlib.md5(b"re-recorded chapter audio").hexdigest()
+            assert third == [str(wav_cache_dir / f"{new_hash}.wav")]
+            assert file_md5.call_count == 2
+            ffmpeg_input.assert_called_once_with(str(mp3_path))
+
+    def test_silence_is_written_without_ffmpeg(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import BufferSegment
+
+        episode = PodcastEpisode(scheduled_reading)
+        episode.WAV_CACHE_DIR = str(tmp_path)
+
+        with mock.patch("ffmpeg.input") as ffmpeg_input:
+            wav_files = episode._convert_segments_to_wav([BufferSegment(1000), BufferSegment(3000)], None)
+
+        ffmpeg_input.assert_not_called()
+        assert wav_files == [str(tmp_path / "silence-1000.wav"), str(tmp_path / "silence-3000.wav")]
+        assert os.path.getsize(wav_files[1]) > os.path.getsize(wav_files[0])
+
+    def test_build_skips_silence_segments(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import BufferSegment
+
+        episode = PodcastEpisode(scheduled_reading)
+        buffer_segment = BufferSegment(1000)
+        speech_segment = mock.Mock(needs_file=True)
+
+        with mock.patch.object(episode, "file_path", return_value=str(tmp_path / "out.mp3")), \
+             mock.patch.object(episode, "segments", return_value=[speech_segment, buffer_segment]), \
+             mock.patch.object(episode, "save_metadata"), \
+             mock.patch.object(episode, "_assemble_single_pass"), \
+             mock.patch.object(buffer_segment, "build") as buffer_build:
+            episode.build(force=True)
+
+        speech_segment.build.assert_called_once_with()
+        buffer_build.assert_not_called()
+
+
+class TestSegmentPlan:
+    """Tests for memoizing the segment plan."""
+
+    class CountingSegment:
+        needs_file = False
+
+        def __init__(self, duration_val, title_val=None):
+            self._duration = duration_val
+            self._title = title_val
+            self.duration_calls = 0
+
+        def duration(self):
+            self.duration_calls += 1
+            return self._duration
+
+        def title(self):
+            return self._title
+
+    def test_plan_has_start_times_and_durations(self):
+        episode = PodcastEpisode(scheduled_reading)
+        segments = [self.CountingSegment(5.0), self.CountingSegment(2.0, "Genesis 6"), self.CountingSegment(3.0)]
+
+        with mock.patch.object(episode, "segments", return_value=segments):
+            plan = episode.segment_plan()
+
+        assert [(p.segment, p.start, p.duration) for p in plan] == [
+            (segments[0], 0, 5.0),
+            (segments[1], 5.0, 2.0),
+            (segments[2], 7.0, 3.0),
+        ]
+
+    def test_segments_and_durations_resolved_once(self, tmp_path):
+        episode = PodcastEpisode(scheduled_reading)
+        segments = [self.CountingSegment(5.0), self.CountingSegment(2.0, "Genesis 6")]
+
+        with mock.patch.object(episode, "_create_segments", return_value=segments) as create, \
+             mock.patch.object(episode, "metadata_store", EpisodeMetadataStore(str(tmp_path / "m.json"))):
+            episode.description()
+            episode.chapter_start_times()
+            episode.save_metadata()
+            assert episode.segments() is episode.segments()
+
+        create.assert_called_once()
+        assert [segment.duration_calls for segment in segments] == [1, 1]
+
+    def test_forced_build_invalidates_plan(self, tmp_path):
+        episode = PodcastEpisode(scheduled_reading)
+        stale = [self.CountingSegment(1.0, "Genesis 6")]
+        fresh = [self.CountingSegment(4.0), self.CountingSegment(1.0, "Genesis 6")]
+
+        with mock.patch.object(episode, "_create_segments", side_effect=[stale, fresh]), \
+             mock.patch.object(episode, "file_path", return_value=str(tmp_path / "out.mp3")), \
+             mock.patch.object(episode, "metadata_store", EpisodeMetadataStore(str(tmp_path / "m.json"))), \
+             mock.patch.object(episode, "_assemble_single_pass"):
+            assert episode.chapter_start_times() == [(0, "Genesis 6")]
+            episode.build(force=True)
+            assert episode.chapter_start_times() == [(4.0, "Genesis 6")]
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+from feedgen.feed import FeedGenerator
+
+from bible_reading_plan.utils.podcast_feed import (
+    FeedItem,
+    FeedItemCache,
+    render_feed_item,
+    write_feed,
+    write_feed_incremental,
+)
+
+START = datetime(2024, 12, 30, tzinfo=timezone.utc)
+
+
+def make_items(count, description="0:08 – Genesis 1<br>5:00 – Genesis 2"):
+    return [
+        FeedItem(
+            f"Week {n // 5 + 1}, Day {n % 5 + 1}",
+            f"https://example.com/readings/{n}.mp3",
+            description,
+            START + timedelta(days=n),
+        )
+        for n in range(count)
+    ]
+
+
+def make_feed():
+    fg = FeedGenerator()
+    fg.load_extension("podcast")
+    fg.title("Five Day Bible Reading Plan (2025)")
+    fg.link(href="https://example.com/", rel="alternate")
+    fg.description("A weekday Bible reading plan podcast for 2025.")
+    fg.id("https://example.com/podcast-2025")
+    fg.logo("https://example.com/logo.png")
+    fg.lastBuildDate(START)
+    return fg
+
+
+def build_both(tmp_path, items, cache):
+    full_path = tmp_path / "full.xml"
+    incremental_path = tmp_path / "incremental.xml"
+    write_feed(make_feed, items, str(full_path))
+    rendered = write_feed_incremental(make_feed, items, str(incremental_path), cache)
+    return full_path.read_bytes(), incremental_path.read_bytes(), rendered
+
+
+class TestIncrementalFeed:
+    def test_cold_build_matches_full_build(self, tmp_path):
+        cache = FeedItemCache(str(tmp_path / "cache" / "podcast-2025.json"))
+        full, incremental, rendered = build_both(tmp_path, make_items(12), cache)
+        assert incremental == full
+        assert rendered == 12
+
+    def test_only_new_entries_are_rendered(self, tmp_path):
+        cache_path = str(tmp_path / "podcast-2025.json")
+        write_feed_incremental(make_feed, make_items(10), str(tmp_path / "feed.xml"), FeedItemCache(cache_path))
+
+        full, incremental, rendered = build_both(tmp_path, make_items(11), FeedItemCache(cache_path))
+        assert incremental == full
+        assert rendered == 1
+
+    def test_changed_entries_are_rerendered(self, tmp_path):
+        cache_path = str(tmp_path / "podcast-2025.json")
+        write_feed_incremental(make_feed, make_items(5), str(tmp_path / "feed.xml"), FeedItemCache(cache_path))
+
+        items = make_items(5)
+        items[2] = items[2]._replace(description="0:07 – Genesis 6 & 7")
+        full, incremental, rendered = build_both(tmp_path, items, FeedItemCache(cache_path))
+        assert incremental == full
+        assert rendered == 1
+
+    def test_cache_drops_removed_entries(self, tmp_path):
+        cache_path = str(tmp_path / "podcast-2025.json")
+        write_feed_incremental(make_feed, make_items(5), str(tmp_path / "feed.xml"), FeedItemCache(cache_path))
+        write_feed_incremental(make_feed, make_items(3), str(tmp_path / "feed.xml"), FeedItemCache(cache_path))
+
+        cache = FeedItemCache(cache_path)
+        assert cache.get(make_items(5)[4]) is None
+        assert cache.get(make_items(3)[2]) is not None
+
+    def test_empty_feed_matches_full_build(self, tmp_path):
+        full, incremental, rendered = build_both(tmp_path, [], FeedItemCache(str(tmp_path / "c.json")))
+        assert incremental == full
+        assert rendered == 0
+
+    def test_render_feed_item(self):
+        xml = render_feed_item(make_feed, make_items(1)[0])
+        assert xml.startswith(b"<item><title>Week 1, Day 1</title>")
+        assert xml.endswith(b"</item>")
+        assert b"Genesis 1&lt;br&gt;" in xml
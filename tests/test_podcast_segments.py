@@ -4,6 +4,8 @@ import unittest.mock as mock
 
 import pytest
 
+from bible_reading_plan.utils.artifact_index import ArtifactIndex
+from bible_reading_plan.utils.esv_downloader import default_downloader
 from bible_reading_plan.utils.podcast_segments import (
     BufferSegment,
     ESVReadingSegment,
@@ -62,6 +64,28 @@ class TestBufferSegment:
         segment = BufferSegment(1000)
         assert segment.title() is None
 
+    def test_does_not_need_file(self):
+        assert not BufferSegment(1000).needs_file
+        assert ESVReadingSegment("Genesis 1").needs_file
+
+    def test_write_wav(self, tmp_path):
+        import wave
+
+        path = str(tmp_path / "silence.wav")
+        BufferSegment(1500).write_wav(path)
+
+        with wave.open(path, "rb") as wav:
+            assert wav.getnchannels() == 1
+            assert wav.getsampwidth() == 2
+            assert wav.getframerate() == 44100
+            assert wav.getnframes() == 66150
+            assert set(wav.readframes(wav.getnframes())) == {0}
+
+    def test_ffmpeg_input_generates_silence(self):
+        args = BufferSegment(2500).ffmpeg_input().output("out.wav").compile()
+        assert args[:6] == ["ffmpeg", "-f", "lavfi", "-t", "2.5", "-i"]
+        assert args[6] == "anullsrc=r=44100:cl=mono"
+
 
 class TestGeneratedSpeechSegment:
     def test_file_path_uses_text_hash(self):
@@ -99,9 +123,9 @@ class TestGeneratedSpeechSegment:
 
     def test_build_with_plain_text(self):
         """Test that plain text uses SynthesisInput.text"""
-        with mock.patch('bible_reading_plan.utils.podcast_segments.texttospeech.TextToSpeechClient') as mock_tts_client, \
-             mock.patch('builtins.open', mock.mock_open()), \
-             mock.patch('os.makedirs'):
+        with mock.patch('bible_reading_plan.utils.speech_synthesis.texttospeech.TextToSpeechClient') as mock_tts_client, \
+             mock.patch('bible_reading_plan.utils.speech_synthesis._client', None), \
+             mock.patch('bible_reading_plan.utils.speech_synthesis.atomic_write', mock.mock_open()):
             
             mock_client = mock.Mock()
             mock_tts_client.return_value = mock_client
@@ -120,9 +144,9 @@ class TestGeneratedSpeechSegment:
 
     def test_build_with_ssml(self):
         """Test that SSML text uses SynthesisInput.ssml"""
-        with mock.patch('bible_reading_plan.utils.podcast_segments.texttospeech.TextToSpeechClient') as mock_tts_client, \
-             mock.patch('builtins.open', mock.mock_open()), \
-             mock.patch('os.makedirs'):
+        with mock.patch('bible_reading_plan.utils.speech_synthesis.texttospeech.TextToSpeechClient') as mock_tts_client, \
+             mock.patch('bible_reading_plan.utils.speech_synthesis._client', None), \
+             mock.patch('bible_reading_plan.utils.speech_synthesis.atomic_write', mock.mock_open()):
             
             mock_client = mock.Mock()
             mock_tts_client.return_value = mock_client
@@ -170,27 +194,35 @@ class TestESVReadingSegment:
             ):
                 segment._build()
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     @mock.patch("os.getenv")
-    @mock.patch("os.makedirs")
-    def test_build_success(self, mock_makedirs, mock_getenv, mock_get):
+    def test_build_success(self, mock_getenv, mock_get, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        chapter_index = ArtifactIndex(str(tmp_path / "esv_chapters.json"))
+        monkeypatch.setattr(default_downloader(), "chapter_index", chapter_index)
         mock_getenv.return_value = "test-api-key"
-        mock_response = mock.Mock()
-        mock_response.content = b"fake audio data"
+        mock_response = mock.MagicMock()
+        mock_response.status_code = 200
+        mock_response.headers = {"Content-Length": "15"}
+        mock_response.iter_content.return_value = [b"fake ", b"audio data"]
+        mock_response.__enter__.return_value = mock_response
         mock_get.return_value = mock_response
 
         segment = ESVReadingSegment("Genesis 1")
-
-        with mock.patch("builtins.open", mock.mock_open()) as mock_file:
-            segment._build()
+        segment.build()
 
         mock_get.assert_called_once_with(
             "https://api.esv.org/v3/passage/audio/?q=Genesis+1",
-            headers={"Authorization": "Token test-api-key"},
+            headers={"Authorization": "Token test-api-key", "Accept-Encoding": "identity"},
+            timeout=60,
+            stream=True,
         )
-        mock_file.assert_called_once_with(segment.file_path(), "wb")
+        with open(segment.file_path(), "rb") as f:
+            assert f.read() == b"fake audio data"
+        assert os.listdir("build/esv_chapters") == ["Genesis_1.mp3"]
+        assert chapter_index.get(segment.file_path())["size"] == 15
 
-    @mock.patch("requests.get")
+    @mock.patch("requests.Session.get")
     @mock.patch("os.getenv")
     @mock.patch("os.makedirs")
     def test_build_request_error(self, mock_makedirs, mock_getenv, mock_get):
@@ -206,3 +238,151 @@ class TestESVReadingSegment:
             match="Failed to download audio for Genesis 1",
         ):
             segment._build()
+
+class TestConcurrentBuilds:
+    def test_shared_artifact_is_built_once(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        segment = BufferSegment(1000)
+        built = []
+
+        def fake_build():
+            built.append(segment.file_path())
+
+        with mock.patch.object(segment, "_build", side_effect=fake_build), \
+             mock.patch.object(segment, "is_built", side_effect=lambda: bool(built)), \
+             mock.patch("os.makedirs"):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: segment.build(), range(32)))
+
+        assert built == [segment.file_path()]
+
+
+class TestDurationIndex:
+    def test_probes_each_file_once(self, tmp_path):
+        from bible_reading_plan.utils.artifact_index import ArtifactIndex
+
+        audio_path = tmp_path / "Genesis_1.mp3"
+        audio_path.write_bytes(b"audio")
+        segment = ESVReadingSegment("Genesis 1")
+        index = ArtifactIndex(str(tmp_path / "durations.json"))
+
+        with mock.patch("bible_reading_plan.utils.podcast_segments.duration_index", index), \
+             mock.patch.object(segment, "file_path", return_value=str(audio_path)), \
+             mock.patch.object(segment, "build"), \
+             mock.patch("ffmpeg.probe", return_value={"format": {"duration": "181.26"}}) as mock_probe:
+            assert segment.duration() == 181.3
+            assert segment.duration() == 181.3
+
+        mock_probe.assert_called_once_with(str(audio_path))
+
+
+def mp3_frame(bitrate_index=9, padding=0, mono=True, payload=None):
+    """Build an MPEG-1 Layer III frame at 44.1 kHz (128 kbps by default)."""
+    header = bytes([0xFF, 0xFB, (bitrate_index << 4) | (padding << 1), 0xC0 if mono else 0x00])
+    bitrate = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320][bitrate_index]
+    length = 144 * bitrate * 1000 // 44100 + padding
+    body = (payload or b"").ljust(length - 4, b"\x00")
+    return header + body
+
+
+class TestMP3Duration:
+    def _write(self, tmp_path, data):
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(data)
+        return str(path)
+
+    def test_parse_frame_header(self):
+        from bible_reading_plan.utils.podcast_segments import parse_frame_header
+
+        frame = parse_frame_header(mp3_frame())
+        assert frame.mpeg1
+        assert frame.layer == 3
+        assert frame.bitrate == 128000
+        assert frame.sample_rate == 44100
+        assert frame.mono
+        assert frame.samples == 1152
+        assert frame.length == 417
+
+        assert parse_frame_header(mp3_frame(padding=1)).length == 418
+        assert parse_frame_header(b"\xff\xfb\xf0\x00") is None  # bad bitrate
+        assert parse_frame_header(b"ID3\x04") is None
+
+    def test_walks_frames(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        data = b"".join(mp3_frame(padding=n % 2) for n in range(100))
+        assert mp3_duration(self._write(tmp_path, data)) == pytest.approx(100 * 1152 / 44100)
+
+    def test_variable_bitrate_frames(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        data = b"".join(mp3_frame(bitrate_index=5 + n % 5) for n in range(50))
+        assert mp3_duration(self._write(tmp_path, data)) == pytest.approx(50 * 1152 / 44100)
+
+    def test_skips_id3_tags(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x01\x00" + b"\x00" * 128
+        id3v1 = b"TAG" + b"\x00" * 125
+        data = id3v2 + b"".join(mp3_frame() for _ in range(10)) + id3v1
+        assert mp3_duration(self._write(tmp_path, data)) == pytest.approx(10 * 1152 / 44100)
+
+    def test_uses_xing_header(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        xing = b"\x00" * 17 + b"Info" + (1).to_bytes(4, "big") + (1000).to_bytes(4, "big")
+        data = mp3_frame(payload=xing) + mp3_frame()
+        assert mp3_duration(self._write(tmp_path, data)) == pytest.approx(1000 * 1152 / 44100)
+
+    def test_reads_only_the_first_frame_for_a_vbr_header(self, tmp_path):
+        from bible_reading_plan.utils import podcast_segments
+
+        xing = b"\x00" * 17 + b"Xing" + (1).to_bytes(4, "big") + (1000).to_bytes(4, "big")
+        data = mp3_frame(payload=xing) + mp3_frame() * 1000
+        path = self._write(tmp_path, data)
+        read_sizes = []
+        real_open = open
+
+        def counting_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            real_read = f.read
+
+            def read(size=-1):
+                chunk = real_read(size)
+                read_sizes.append(len(chunk))
+                return chunk
+
+            f.read = read
+            return f
+
+        with mock.patch("builtins.open", counting_open):
+            assert podcast_segments.mp3_duration(path) == pytest.approx(1000 * 1152 / 44100)
+        assert sum(read_sizes) <= 10 + 417
+
+    def test_uses_vbri_header(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        vbri = b"\x00" * 32 + b"VBRI" + b"\x00" * 10 + (500).to_bytes(4, "big")
+        data = mp3_frame(payload=vbri) + mp3_frame()
+        assert mp3_duration(self._write(tmp_path, data)) == pytest.approx(500 * 1152 / 44100)
+
+    def test_returns_none_for_unparseable_file(self, tmp_path):
+        from bible_reading_plan.utils.podcast_segments import mp3_duration
+
+        assert mp3_duration(self._write(tmp_path, b"not an mp3 file")) is None
+        assert mp3_duration(self._write(tmp_path, mp3_frame() + b"garbage" * 100)) is None
+
+    def test_duration_falls_back_to_ffprobe(self, tmp_path):
+        from bible_reading_plan.utils.artifact_index import ArtifactIndex
+
+        segment = GeneratedSpeechSegment("Hello")
+        index = ArtifactIndex(str(tmp_path / "durations.json"))
+        native_path = self._write(tmp_path, b"".join(mp3_frame() for _ in range(100)))
+
+        with mock.patch("bible_reading_plan.utils.podcast_segments.duration_index", index), \
+             mock.patch.object(segment, "file_path", return_value=native_path), \
+             mock.patch.object(segment, "build"), \
+             mock.patch("ffmpeg.probe") as mock_probe:
+            assert segment.duration() == 2.6
+        mock_probe.assert_not_called()
@@ -1,4 +1,14 @@
-from bible_reading_plan.utils.readings import ScriptureReading, apply_psalm_ssml
+import datetime
+
+from bible_reading_plan.utils.readings import (
+    ScriptureReading,
+    apply_psalm_ssml,
+    index_of_today,
+    iter_readings_with_dates,
+    reading_for_date,
+    readings_between,
+    readings_with_dates,
+)
 
 
 def test_reading_to_chapters():
@@ -85,3 +95,78 @@ def test_apply_psalm_ssml_in_mixed_reading():
     """Test Psalm formatting within a mixed reading string."""
     result = apply_psalm_ssml("Genesis 1-3; Psalm 104; and Mark 1")
     assert result == 'Genesis 1-3; Psalm <say-as interpret-as="cardinal">104</say-as>; and Mark 1'
+
+
+def test_reading_to_chapter_ids():
+    from bible_reading_plan.utils.bible_books import chapter_id_from_name, chapter_name
+
+    reading = ScriptureReading("Jer 22, 23, 26; Psalms 3, 63; Philemon")
+    chapter_ids = reading.to_chapter_ids()
+    assert chapter_ids.typecode == "H"
+    assert [chapter_name(c) for c in chapter_ids] == [
+        "Jeremiah 22", "Jeremiah 23", "Jeremiah 26", "Psalm 3", "Psalm 63", "Philemon",
+    ]
+    assert chapter_ids[0] == chapter_id_from_name("Jeremiah 22")
+
+
+def test_reading_to_chapter_ids_whole_book():
+    from bible_reading_plan.utils.bible_books import chapter_name
+
+    reading = ScriptureReading("Haggai; Zechariah 1")
+    assert [chapter_name(c) for c in reading.to_chapter_ids()] == [
+        "Haggai 1", "Haggai 2", "Zechariah 1",
+    ]
+
+
+class TestSchedule:
+    FIRST_MONDAY = datetime.datetime(2024, 12, 30)
+
+    def test_iter_readings_is_lazy_and_matches_list(self):
+        iterator = iter_readings_with_dates(self.FIRST_MONDAY)
+        assert not isinstance(iterator, list)
+        eager = readings_with_dates(self.FIRST_MONDAY)
+        lazy = list(iter_readings_with_dates(self.FIRST_MONDAY))
+        assert [(r.due_date, r.week, r.day, r.scripture_reading.raw_reading) for r in lazy] == [
+            (r.due_date, r.week, r.day, r.scripture_reading.raw_reading) for r in eager
+        ]
+
+    def test_iter_readings_from_start_index(self):
+        first = next(iter_readings_with_dates(self.FIRST_MONDAY, start_index=7))
+        assert (first.week, first.day) == (2, 3)
+        assert first.due_date == datetime.datetime(2025, 1, 8)
+
+    def test_reading_for_date(self):
+        reading = reading_for_date(self.FIRST_MONDAY, datetime.date(2025, 1, 1))
+        assert (reading.week, reading.day) == (1, 3)
+        assert reading.scripture_reading.raw_reading == "Gen 6-8; Psalm 104; Mark 3"
+
+        last = reading_for_date(self.FIRST_MONDAY, datetime.date(2025, 12, 26))
+        assert (last.week, last.day) == (52, 5)
+
+    def test_reading_for_date_outside_plan(self):
+        assert reading_for_date(self.FIRST_MONDAY, datetime.date(2025, 1, 4)) is None  # Saturday
+        assert reading_for_date(self.FIRST_MONDAY, datetime.date(2024, 12, 27)) is None
+        assert reading_for_date(self.FIRST_MONDAY, datetime.date(2025, 12, 29)) is None
+
+    def test_readings_between(self):
+        selected = list(readings_between(
+            self.FIRST_MONDAY, datetime.date(2025, 1, 2), datetime.date(2025, 1, 7)
+        ))
+        assert [(r.week, r.day) for r in selected] == [(1, 4), (1, 5), (2, 1), (2, 2)]
+
+        weekend = readings_between(self.FIRST_MONDAY, datetime.date(2025, 1, 4), datetime.date(2025, 1, 5))
+        assert list(weekend) == []
+
+    def test_index_of_today(self):
+        assert index_of_today(self.FIRST_MONDAY, datetime.datetime(2024, 12, 29, 23)) == -1
+        assert index_of_today(self.FIRST_MONDAY, datetime.datetime(2024, 12, 30, 0)) == 0
+        assert index_of_today(self.FIRST_MONDAY, datetime.datetime(2025, 1, 5, 12)) == 4
+        assert index_of_today(self.FIRST_MONDAY, datetime.datetime(2025, 1, 6, 9)) == 5
+        assert index_of_today(self.FIRST_MONDAY, datetime.datetime(2026, 6, 1)) == 259
+
+    def test_index_of_today_matches_linear_scan(self):
+        schedule = readings_with_dates(self.FIRST_MONDAY)
+        for offset in range(0, 380, 3):
+            now = self.FIRST_MONDAY + datetime.timedelta(days=offset, hours=9)
+            expected = sum(1 for r in schedule if r.due_date <= now) - 1
+            assert index_of_today(self.FIRST_MONDAY, now) == expected
@@ -0,0 +1,89 @@
+import datetime
+
+import pytest
+
+from bible_reading_plan.utils.todoist_sync import (
+    ImportCheckpoint,
+    SyncError,
+    TodoistSync,
+    item_add_command,
+)
+
+
+def add_commands(count):
+    due_date = datetime.datetime(2025, 1, 6)
+    return [item_add_command(f"Read {n}", "project-1", due_date) for n in range(count)]
+
+
+class TestItemAddCommand:
+    def test_command(self):
+        command = item_add_command("Read Genesis 1", "project-1", datetime.datetime(2025, 1, 6))
+        assert command["type"] == "item_add"
+        assert command["args"] == {
+            "content": "Read Genesis 1",
+            "project_id": "project-1",
+            "due": {"date": "2025-01-06"},
+        }
+        assert command["uuid"] != command["temp_id"]
+
+
+class TestTodoistSync:
+    def test_sends_commands_in_batches(self, todoist_server):
+        sync = todoist_server.sync(batch_size=100)
+        batches = []
+        sync.send(add_commands(250), on_batch=batches.append)
+
+        assert [len(batch) for batch in batches] == [100, 100, 50]
+        assert [len(commands) for commands in todoist_server.command_requests()] == [100, 100, 50]
+        assert len(todoist_server.items) == 250
+        assert todoist_server.requests[0][1] == "Bearer test-token"
+
+    def test_retries_rate_limited_requests(self, todoist_server):
+        todoist_server.failures = [429, 503]
+        sleeps = []
+        sync = todoist_server.sync(sleep=sleeps.append)
+        sync.send(add_commands(3))
+
+        assert len(todoist_server.items) == 3
+        assert sleeps == [0.0, 0.0]
+
+    def test_gives_up_after_max_retries(self, todoist_server):
+        todoist_server.failures = [429] * 3
+        sync = todoist_server.sync(max_retries=2, sleep=lambda seconds: None)
+        with pytest.raises(SyncError, match="429"):
+            sync.send(add_commands(1))
+
+    def test_failed_commands_raise(self, todoist_server):
+        commands = add_commands(2)
+        commands[1]["type"] = "item_bogus"
+        with pytest.raises(SyncError, match="1 of 2 commands failed: item_bogus 'Read 1'"):
+            todoist_server.sync().send(commands)
+
+    def test_rejects_oversized_batches(self):
+        with pytest.raises(ValueError):
+            TodoistSync("test-token", batch_size=101)
+
+
+class TestReadItems:
+    def test_reads_project_items(self, todoist_server):
+        todoist_server.add_item("Read Genesis 1", "project-1", "2025-01-06")
+        todoist_server.add_item("Read Genesis 2", "project-2", "2025-01-07")
+
+        items = todoist_server.sync().read_items("project-1")
+
+        assert [item["content"] for item in items] == ["Read Genesis 1"]
+        assert len(todoist_server.requests) == 1
+
+
+class TestImportCheckpoint:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "todoist" / "import.json")
+        commands = add_commands(3)
+
+        checkpoint = ImportCheckpoint(path)
+        assert checkpoint.plan(commands) == commands
+        checkpoint.mark_sent(commands[:2])
+
+        reloaded = ImportCheckpoint(path)
+        assert reloaded.plan(add_commands(3)) == commands
+        assert reloaded.sent_keys() == {("Read 0", "2025-01-06"), ("Read 1", "2025-01-06")}